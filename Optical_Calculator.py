@@ -1,16 +1,33 @@
 import tkinter as tk
 from tkinter import ttk
-import math
 
-# --- 常量定义 ---
-C = 299_792_458.0  # 光速 m/s
+import numpy as np
 
-# 单位换算因子
-UNIT_FACTORS = {
-    'frequency': {'Hz': 1, 'MHz': 1e6, 'GHz': 1e9, 'THz': 1e12},
-    'wavelength': {'m': 1, 'mm': 1e-3, 'µm': 1e-6, 'nm': 1e-9, 'pm': 1e-12},
-    'wavenumber': {'1/m': 1, '1/cm': 1e2},
-}
+# 常量、单位与向量化公式统一定义在 waveconvert 中 (GUI 与批处理共用)
+from waveconvert import (POWER_UNITS, UNIT_FACTORS, abs_si, delta_si, describe_band, from_si, mw_to_power,
+                         photon_energy, photon_flux, power_to_mw, to_si)
+from coupling import COUPLING_OPTIONS, coupling_from_inputs
+from lenscatalog import default_catalog
+import dispersion
+from airvacuum import OUT_OF_RANGE, STANDARD_AIR, air_to_vacuum, air_width_factor, vacuum_to_air
+from itugrid import describe as itu_describe
+import nonlinear
+from calcgraph import Choice, Debouncer, Derived, Field, Graph, Group
+from jobrunner import JobRunner
+import instrument
+
+VACUUM = '真空'
+AIR = '空气'
+
+# 输入框 tag -> 所属的联动组
+GROUPS = {'f': 'abs', 'l': 'abs', 'k': 'abs', 'df': 'delta', 'dl': 'delta', 'dk': 'delta',
+          'dbm': 'power', 'mw': 'power', 'w': 'power'}
+
+# 仪器实时读数刷新界面的间隔 (读取与换算在后台线程中以全速进行)
+INSTRUMENT_REFRESH_MS = 100
+
+# 非线性组合表最多显示的行数 (完整结果可用 nonlinear 模块批量导出)
+NONLINEAR_MAX_ROWS = 500
 
 class IntegratedOpticalCalculator:
     def __init__(self, root):
@@ -18,22 +35,25 @@ class IntegratedOpticalCalculator:
         self.root.title("光电计算器")
         
         # 设置窗口大小和位置
-        self.root.geometry("800x600+100+100")
-        self.root.minsize(750, 550)
+        self.root.geometry("800x830+100+50")
+        self.root.minsize(750, 770)
         
         # 配置主窗口的权重
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
         
+        # 后台任务 (耗时计算不阻塞界面)，关闭窗口时一并取消
+        self.jobs = JobRunner(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        
         # 设置样式
         self._setup_styles()
         
         # 创建主框架
         self.create_main_interface()
         
-        # 初始化波长计算器的状态变量
-        self.current_source = None
-        self.last_delta_source = 'dl'
+        # 各栏位之间的联动关系
+        self._build_graph()
 
     def _setup_styles(self):
         """设置界面样式"""
@@ -50,8 +70,11 @@ class IntegratedOpticalCalculator:
 
     def create_main_interface(self):
         """创建主界面"""
-        main_frame = ttk.Frame(self.root, padding="15")
-        main_frame.grid(row=0, column=0, sticky="nsew")
+        notebook = ttk.Notebook(self.root)
+        notebook.grid(row=0, column=0, sticky="nsew")
+        
+        main_frame = ttk.Frame(notebook, padding="15")
+        notebook.add(main_frame, text="计算器")
         
         # 配置主框架
         main_frame.columnconfigure(0, weight=1)
@@ -83,6 +106,12 @@ class IntegratedOpticalCalculator:
         
         # 底部说明
         self.create_info_section(main_frame)
+        
+        # 非线性频率变换标签页
+        self.create_nonlinear_tab(notebook)
+        
+        # 仪器实时读数标签页
+        self.create_instrument_tab(notebook)
 
     def create_wavelength_section(self, parent):
         """创建波长转换部分"""
@@ -96,19 +125,29 @@ class IntegratedOpticalCalculator:
         
         # 绝对值转换
         ttk.Label(wave_frame, text="绝对值:", font=('微软雅黑', 10, 'bold')).grid(
-            row=0, column=0, columnspan=3, sticky='w', pady=(0, 5))
+            row=0, column=0, columnspan=2, sticky='w', pady=(0, 5))
+        
+        # 实时计算：输入时自动换算 (关闭后仅在按 Enter 时计算)
+        self.live_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(wave_frame, text="实时", variable=self.live_var).grid(
+            row=0, column=2, sticky='e', pady=(0, 5))
         
         # 频率
         self.f_var, self.f_unit = self._create_conversion_row(
-            wave_frame, 1, "频率:", 'THz', 'frequency', 'f', self._calc_abs)
+            wave_frame, 1, "频率:", 'THz', 'frequency', 'f')
+        
+        # ITU 信道 (显示在频率/波长旁)
+        self.itu_var = tk.StringVar()
+        ttk.Label(wave_frame, textvariable=self.itu_var, foreground='#2E86AB').grid(
+            row=1, column=3, rowspan=2, sticky='w', padx=(5, 0))
         
         # 波长
         self.l_var, self.l_unit = self._create_conversion_row(
-            wave_frame, 2, "波长:", 'nm', 'wavelength', 'l', self._calc_abs)
+            wave_frame, 2, "波长:", 'nm', 'wavelength', 'l')
         
         # 波数
         self.k_var, self.k_unit = self._create_conversion_row(
-            wave_frame, 3, "波数:", '1/cm', 'wavenumber', 'k', self._calc_abs)
+            wave_frame, 3, "波数:", '1/cm', 'wavenumber', 'k')
         
         # 分隔线
         sep = ttk.Separator(wave_frame, orient='horizontal')
@@ -120,15 +159,49 @@ class IntegratedOpticalCalculator:
         
         # Delta频率
         self.df_var, self.df_unit = self._create_conversion_row(
-            wave_frame, 6, "Δ频率:", 'GHz', 'frequency', 'df', self._calc_delta)
+            wave_frame, 6, "Δ频率:", 'GHz', 'frequency', 'df')
         
         # Delta波长
         self.dl_var, self.dl_unit = self._create_conversion_row(
-            wave_frame, 7, "Δ波长:", 'nm', 'wavelength', 'dl', self._calc_delta)
+            wave_frame, 7, "Δ波长:", 'nm', 'wavelength', 'dl')
         
         # Delta波数
         self.dk_var, self.dk_unit = self._create_conversion_row(
-            wave_frame, 8, "Δ波数:", '1/cm', 'wavenumber', 'dk', self._calc_delta)
+            wave_frame, 8, "Δ波数:", '1/cm', 'wavenumber', 'dk')
+        
+        # 介质 (Sellmeier 色散)：Δk 按群折射率换算，并显示 n / n_g / 介质内波长 / GVD
+        ttk.Label(wave_frame, text="介质:").grid(row=9, column=0, sticky='e', padx=5, pady=6)
+        self.medium_var = tk.StringVar(value=VACUUM)
+        medium_cb = ttk.Combobox(wave_frame, textvariable=self.medium_var,
+                                 values=[VACUUM] + dispersion.materials(), width=12, state='readonly')
+        medium_cb.grid(row=9, column=1, columnspan=2, sticky='w', padx=5, pady=6)
+        medium_cb.bind('<<ComboboxSelected>>', lambda e: self.graph.edit('medium'))
+        
+        self.medium_info_var = tk.StringVar()
+        ttk.Label(wave_frame, textvariable=self.medium_info_var, foreground='#666',
+                  justify='left').grid(row=10, column=0, columnspan=3, sticky='w', padx=5)
+        
+        # 波长基准：空气波长按下方环境参数 (默认标准空气) 的 Ciddor 公式换算，λ 与 Δλ 均显示空气值
+        ttk.Label(wave_frame, text="波长基准:").grid(row=11, column=0, sticky='e', padx=5, pady=6)
+        self.l_ref_var = tk.StringVar(value=VACUUM)
+        ref_cb = ttk.Combobox(wave_frame, textvariable=self.l_ref_var,
+                              values=[VACUUM, AIR], width=12, state='readonly')
+        ref_cb.grid(row=11, column=1, columnspan=2, sticky='w', padx=5, pady=6)
+        ref_cb.bind('<<ComboboxSelected>>', lambda e: self._on_reference_changed())
+        
+        # 空气环境: 温度 °C、气压 Pa、相对湿度 0~1、CO₂ ppm
+        ttk.Label(wave_frame, text="空气环境:").grid(row=12, column=0, sticky='e', padx=5, pady=6)
+        self.air_env_var = tk.StringVar(value=" ".join(f"{v:g}" for v in STANDARD_AIR))
+        env_entry = ttk.Entry(wave_frame, textvariable=self.air_env_var, width=10, justify='right')
+        env_entry.grid(row=12, column=1, sticky='ew', padx=5, pady=6)
+        env_entry.bind('<Return>', lambda e: self._on_air_env_changed())
+        env_entry.bind('<FocusOut>', lambda e: self._on_air_env_changed())
+        ttk.Label(wave_frame, text="°C Pa RH ppm", foreground='#666').grid(row=12, column=2, sticky='w', padx=5)
+        
+        # 精确区间 (端点逐一换算)，与上面的一阶 Δ 结果并列显示
+        self.band_var = tk.StringVar()
+        ttk.Label(wave_frame, textvariable=self.band_var, foreground='#666',
+                  justify='left').grid(row=13, column=0, columnspan=3, sticky='w', padx=5)
 
     def create_power_section(self, parent):
         """创建功率转换部分"""
@@ -144,21 +217,29 @@ class IntegratedOpticalCalculator:
         self.p_dbm = tk.StringVar()
         dbm_entry = ttk.Entry(power_frame, textvariable=self.p_dbm, width=10, justify='right')
         dbm_entry.grid(row=0, column=1, sticky='ew', padx=3, pady=5)
-        dbm_entry.bind('<Return>', lambda e: self._calc_power())
+        dbm_entry.bind('<Return>', lambda e: self._trigger_calc('dbm'))
+        dbm_entry.bind('<KeyRelease>', lambda e: self._on_key('dbm'))
         
         # mW
         ttk.Label(power_frame, text="mW:").grid(row=1, column=0, sticky='e', padx=3, pady=5)
         self.p_mw = tk.StringVar()
         mw_entry = ttk.Entry(power_frame, textvariable=self.p_mw, width=10, justify='right')
         mw_entry.grid(row=1, column=1, sticky='ew', padx=3, pady=5)
-        mw_entry.bind('<Return>', lambda e: self._calc_power())
+        mw_entry.bind('<Return>', lambda e: self._trigger_calc('mw'))
+        mw_entry.bind('<KeyRelease>', lambda e: self._on_key('mw'))
         
         # W
         ttk.Label(power_frame, text="W:").grid(row=2, column=0, sticky='e', padx=3, pady=5)
         self.p_w = tk.StringVar()
         w_entry = ttk.Entry(power_frame, textvariable=self.p_w, width=10, justify='right')
         w_entry.grid(row=2, column=1, sticky='ew', padx=3, pady=5)
-        w_entry.bind('<Return>', lambda e: self._calc_power())
+        w_entry.bind('<Return>', lambda e: self._trigger_calc('w'))
+        w_entry.bind('<KeyRelease>', lambda e: self._on_key('w'))
+        
+        # 光子能量/通量 (联动波长转换中的当前波长)
+        self.photon_var = tk.StringVar()
+        ttk.Label(power_frame, textvariable=self.photon_var, foreground='#666',
+                  justify='left').grid(row=3, column=0, columnspan=2, sticky='w', padx=3, pady=(5, 0))
 
     def create_fiber_coupling_section(self, parent):
         """创建光纤耦合计算部分"""
@@ -182,19 +263,28 @@ class IntegratedOpticalCalculator:
         ttk.Label(fiber_frame, text="mm").grid(row=1, column=2, sticky='w', padx=(0, 5))
         
         # MFD输入
-        ttk.Label(fiber_frame, text="MFD (μm):").grid(row=2, column=0, sticky='e', padx=3, pady=5)
+        ttk.Label(fiber_frame, text="MFD (μm)/光纤:").grid(row=2, column=0, sticky='e', padx=3, pady=5)
         self.mfd_entry = ttk.Entry(fiber_frame, width=10, justify='right')
         self.mfd_entry.grid(row=2, column=1, sticky='ew', padx=3, pady=5)
         ttk.Label(fiber_frame, text="μm").grid(row=2, column=2, sticky='w', padx=(0, 5))
         
+        # 实际透镜与对准误差 (可选，留空按理想情况计算)
+        self.coupling_option_entries = {}
+        for row, (key, label, unit, _) in enumerate(COUPLING_OPTIONS, start=3):
+            ttk.Label(fiber_frame, text=f"{label} ({unit}):").grid(row=row, column=0, sticky='e', padx=3, pady=3)
+            entry = ttk.Entry(fiber_frame, width=10, justify='right')
+            entry.grid(row=row, column=1, sticky='ew', padx=3, pady=3)
+            ttk.Label(fiber_frame, text=unit).grid(row=row, column=2, sticky='w', padx=(0, 5))
+            self.coupling_option_entries[key] = entry
+        
         # 计算按钮
         calc_btn = ttk.Button(fiber_frame, text="计算焦距", 
                              command=self.calculate_fiber_coupling, style='Big.TButton')
-        calc_btn.grid(row=3, column=0, columnspan=3, pady=10)
+        calc_btn.grid(row=7, column=0, columnspan=3, pady=10)
         
         # 结果显示
         result_frame = ttk.Frame(fiber_frame)
-        result_frame.grid(row=4, column=0, columnspan=3, sticky="ew", pady=(5, 3))
+        result_frame.grid(row=8, column=0, columnspan=3, sticky="ew", pady=(5, 3))
         
         self.fiber_result_var = tk.StringVar()
         result_label = ttk.Label(result_frame, textvariable=self.fiber_result_var, 
@@ -208,15 +298,229 @@ class IntegratedOpticalCalculator:
         
         info_text = (
             "💡 使用说明:\n"
-            "• 波长转换：输入任意一个值，按Enter键自动转换其他单位\n"
-            "• 功率转换：在任意功率单位中输入数值，按Enter键转换其他单位\n"
-            "• 光纤耦合：输入三个参数，点击计算焦距获取最佳耦合焦距\n"
+            "• 波长转换：输入任意一个值，实时换算其他单位 (关闭“实时”后按Enter键换算)；选择介质后 Δ波数按群折射率换算；波长基准可选空气 (λ、Δλ 为空气值，可设温度/气压/湿度/CO₂)；下方显示精确区间端点 (真空)，一阶误差过大时标 ⚠\n"
+            "• 功率转换：在任意功率单位中输入数值，实时转换其他单位\n"
+            "• 光子能量/通量：根据当前波长与功率(mW)自动显示\n"
+            "• 仪器：在“仪器”标签页连接波长计数据流 (或模拟器)，频率/波长/功率随读数实时刷新并显示滚动统计\n"
+            "• 非线性：在“非线性”标签页输入泵浦/信号列表，计算 SHG/THG/SFG/DFG 全部组合并按目标波段筛选\n"
+            "• 光纤耦合：输入三个参数 (MFD 也可填光纤型号如 SMF-28)，点击计算焦距获取最佳耦合焦距；可选填实际焦距与对准误差计算耦合效率\n"
             "• 物理公式：f = (π × D × MFD) / (4 × λ) | Δf = (c/λ²) × Δλ"
         )
         ttk.Label(info_frame, text=info_text, font=('微软雅黑', 9), 
                  foreground="#666", justify="left").pack(pady=8)
 
-    def _create_conversion_row(self, parent, row, label, unit_def, unit_type, tag, callback):
+    def create_nonlinear_tab(self, notebook):
+        """创建非线性频率变换 (SHG/THG/SFG/DFG) 标签页"""
+        nl_frame = ttk.Frame(notebook, padding="15")
+        notebook.add(nl_frame, text="非线性")
+        nl_frame.columnconfigure(1, weight=1)
+        nl_frame.rowconfigure(6, weight=1)
+        
+        ttk.Label(nl_frame, text="泵浦列表:").grid(row=0, column=0, sticky='e', padx=3, pady=5)
+        self.nl_pump_entry = ttk.Entry(nl_frame)
+        self.nl_pump_entry.grid(row=0, column=1, sticky='ew', padx=3, pady=5)
+        ttk.Label(nl_frame, text="信号列表:").grid(row=1, column=0, sticky='e', padx=3, pady=5)
+        self.nl_signal_entry = ttk.Entry(nl_frame)
+        self.nl_signal_entry.grid(row=1, column=1, sticky='ew', padx=3, pady=5)
+        
+        self.nl_unit_var = tk.StringVar(value='nm')
+        ttk.Combobox(nl_frame, textvariable=self.nl_unit_var, values=list(UNIT_FACTORS['wavelength'].keys())
+                     + list(UNIT_FACTORS['frequency'].keys()), width=6, state='readonly'
+                     ).grid(row=0, column=2, rowspan=2, sticky='w', padx=5)
+        
+        # 过程选择
+        proc_frame = ttk.Frame(nl_frame)
+        proc_frame.grid(row=2, column=1, sticky='w', pady=5)
+        self.nl_process_vars = {}
+        for p in nonlinear.PROCESSES:
+            var = tk.BooleanVar(value=True)
+            ttk.Checkbutton(proc_frame, text=p, variable=var).pack(side='left', padx=(0, 10))
+            self.nl_process_vars[p] = var
+        
+        # 目标波段 (留空不限制)
+        ttk.Label(nl_frame, text="目标波段:").grid(row=3, column=0, sticky='e', padx=3, pady=5)
+        band_frame = ttk.Frame(nl_frame)
+        band_frame.grid(row=3, column=1, sticky='w', pady=5)
+        self.nl_band_lo = ttk.Entry(band_frame, width=10, justify='right')
+        self.nl_band_lo.pack(side='left')
+        ttk.Label(band_frame, text=" ~ ").pack(side='left')
+        self.nl_band_hi = ttk.Entry(band_frame, width=10, justify='right')
+        self.nl_band_hi.pack(side='left')
+        ttk.Label(band_frame, text=" (与输入同单位)").pack(side='left')
+        
+        btn_frame = ttk.Frame(nl_frame)
+        btn_frame.grid(row=4, column=0, columnspan=3, pady=10)
+        ttk.Button(btn_frame, text="计算组合", command=self.calculate_nonlinear,
+                   style='Big.TButton').pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="取消", command=lambda: self.cancel_job('nonlinear')).pack(side='left', padx=5)
+        
+        # 状态与进度 (计算在后台线程中进行)
+        status_frame = ttk.Frame(nl_frame)
+        status_frame.grid(row=5, column=0, columnspan=3, sticky='ew')
+        status_frame.columnconfigure(0, weight=1)
+        self.nl_result_var = tk.StringVar()
+        ttk.Label(status_frame, textvariable=self.nl_result_var).grid(row=0, column=0, sticky='w')
+        self.nl_progress = ttk.Progressbar(status_frame, length=160, maximum=1.0)
+        self.nl_progress.grid(row=0, column=1, sticky='e')
+        
+        columns = ('process', 'pump', 'signal', 'out_nm', 'out_thz')
+        headings = ('过程', '泵浦', '信号', '输出 (nm)', '输出 (THz)')
+        self.nl_tree = ttk.Treeview(nl_frame, columns=columns, show='headings')
+        for col, text in zip(columns, headings):
+            self.nl_tree.heading(col, text=text)
+            self.nl_tree.column(col, width=110, anchor='e')
+        self.nl_tree.grid(row=6, column=0, columnspan=3, sticky='nsew', pady=(5, 0))
+        scroll = ttk.Scrollbar(nl_frame, orient='vertical', command=self.nl_tree.yview)
+        scroll.grid(row=6, column=3, sticky='ns', pady=(5, 0))
+        self.nl_tree.configure(yscrollcommand=scroll.set)
+
+    def calculate_nonlinear(self):
+        """计算泵浦/信号列表的全部非线性组合并按目标波段筛选"""
+        try:
+            pumps = [float(v) for v in self.nl_pump_entry.get().replace(',', ' ').split()]
+            signals = [float(v) for v in self.nl_signal_entry.get().replace(',', ' ').split()] or None
+            lo, hi = self.nl_band_lo.get().strip(), self.nl_band_hi.get().strip()
+            band = (float(lo), float(hi)) if lo and hi else None
+        except ValueError:
+            self.nl_result_var.set("错误: 请输入有效的数字 (以逗号或空格分隔)")
+            return
+        processes = [p for p, var in self.nl_process_vars.items() if var.get()]
+        if not pumps or not processes:
+            self.nl_result_var.set("错误: 请输入泵浦列表并至少选择一个过程")
+            return
+        
+        # 组合数随列表长度平方增长，放到后台计算；再次点击会取代尚未完成的计算
+        self.nl_result_var.set("计算中…")
+        self.nl_progress['value'] = 0
+        self.jobs.submit('nonlinear', self._nonlinear_job, pumps, signals, self.nl_unit_var.get(),
+                         processes, band,
+                         on_done=lambda table: self._show_nonlinear(table, pumps, signals),
+                         on_error=lambda e: self._job_failed('nonlinear', e),
+                         on_progress=lambda frac, msg: self.nl_progress.configure(value=frac))
+
+    @staticmethod
+    def _nonlinear_job(job, pumps, signals, unit, processes, band):
+        """后台线程: 计算组合表，每处理一块泵浦行报告一次进度 (同时检查是否已取消)"""
+        return nonlinear.mixing_table(pumps, signals, unit, processes, band, progress=job.progress)
+
+    def _show_nonlinear(self, table, pumps, signals):
+        """主线程: 显示组合表 (最多 NONLINEAR_MAX_ROWS 行)"""
+        values = signals or pumps
+        out_nm = nonlinear.output_in(table[:NONLINEAR_MAX_ROWS], 'nm')
+        self.nl_progress['value'] = 1.0
+        
+        self.nl_tree.delete(*self.nl_tree.get_children())
+        for row, nm in zip(table[:NONLINEAR_MAX_ROWS], out_nm):
+            signal = f"{values[row['j']]:g}" if row['j'] >= 0 else "-"
+            self.nl_tree.insert('', 'end', values=(str(row['process']), f"{pumps[row['i']]:g}", signal,
+                                                   f"{nm:.4f}", f"{row['freq'] / 1e12:.4f}"))
+        text = f"共 {len(table)} 个组合"
+        if len(table) > NONLINEAR_MAX_ROWS:
+            text += f" (仅显示前 {NONLINEAR_MAX_ROWS} 个)"
+        self.nl_result_var.set(text)
+
+    def create_instrument_tab(self, notebook):
+        """创建仪器实时读数标签页 (本地 socket / 管道，或内置模拟器)"""
+        inst_frame = ttk.Frame(notebook, padding="15")
+        notebook.add(inst_frame, text="仪器")
+        inst_frame.columnconfigure(1, weight=1)
+        self.instrument = None
+        
+        ttk.Label(inst_frame, text="数据源:").grid(row=0, column=0, sticky='e', padx=3, pady=5)
+        self.inst_source_var = tk.StringVar(value="127.0.0.1:5025")
+        ttk.Entry(inst_frame, textvariable=self.inst_source_var).grid(row=0, column=1, sticky='ew', padx=3, pady=5)
+        ttk.Label(inst_frame, text="(host:port 或管道路径)", foreground='#666').grid(row=0, column=2, sticky='w')
+        
+        ttk.Label(inst_frame, text="读数单位:").grid(row=1, column=0, sticky='e', padx=3, pady=5)
+        self.inst_unit_var = tk.StringVar(value='nm')
+        ttk.Combobox(inst_frame, textvariable=self.inst_unit_var, values=list(UNIT_FACTORS['wavelength'].keys())
+                     + list(UNIT_FACTORS['frequency'].keys()), width=6, state='readonly'
+                     ).grid(row=1, column=1, sticky='w', padx=3, pady=5)
+        ttk.Label(inst_frame, text="功率单位:").grid(row=2, column=0, sticky='e', padx=3, pady=5)
+        self.inst_power_var = tk.StringVar(value='dBm')
+        ttk.Combobox(inst_frame, textvariable=self.inst_power_var, values=list(POWER_UNITS), width=6,
+                     state='readonly').grid(row=2, column=1, sticky='w', padx=3, pady=5)
+        
+        btn_frame = ttk.Frame(inst_frame)
+        btn_frame.grid(row=3, column=0, columnspan=3, pady=10)
+        ttk.Button(btn_frame, text="连接", command=self.connect_instrument,
+                   style='Big.TButton').pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="模拟", command=self.simulate_instrument).pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="断开", command=self.disconnect_instrument).pack(side='left', padx=5)
+        
+        # 滚动统计 (最近 1 s)；频率/波长/功率写入“计算器”页的对应输入框
+        self.inst_status_var = tk.StringVar(value="未连接")
+        ttk.Label(inst_frame, textvariable=self.inst_status_var, style='Result.TLabel',
+                  justify='left').grid(row=4, column=0, columnspan=3, sticky='w', pady=5)
+
+    def connect_instrument(self):
+        """连接仪器数据流"""
+        try:
+            inst = instrument.Instrument.open(self.inst_source_var.get().strip(), unit=self.inst_unit_var.get(),
+                                              power_unit=self.inst_power_var.get())
+        except (OSError, ValueError) as e:
+            self.inst_status_var.set(f"错误: {e}")
+            return
+        self._start_instrument(inst)
+
+    def simulate_instrument(self):
+        """使用内置模拟器 (1550 nm，1 kHz 读数) 代替真实仪器"""
+        inst, _ = instrument.simulate_pipe(center=1550.0, unit='nm', rate=1000.0)
+        self.inst_unit_var.set('nm')
+        self._start_instrument(inst)
+
+    def disconnect_instrument(self):
+        if self.instrument is not None:
+            self.instrument.stop()
+            self.instrument = None
+            self.inst_status_var.set("未连接")
+
+    def _start_instrument(self, inst):
+        self.disconnect_instrument()
+        self.instrument = inst.start()
+        self._inst_count = 0
+        self.inst_status_var.set("等待数据…")
+        self.root.after(INSTRUMENT_REFRESH_MS, self._poll_instrument, inst)
+
+    def _poll_instrument(self, inst):
+        """主线程定时刷新: 只取上次刷新后的新读数的均值写入输入框，并显示滚动统计"""
+        if inst is not self.instrument:
+            return
+        rows, self._inst_count = inst.buffer.since(self._inst_count)
+        if len(rows):
+            self.graph['abs'].fields['f'].write(float(rows[:, 1].mean()))
+            self.graph.edit('abs', 'f')
+            power = rows[:, 2]
+            if np.isfinite(power).any():
+                self.graph['power'].fields['mw'].write(float(np.nanmean(power)))
+                self.graph.edit('power', 'mw')
+            self.inst_status_var.set(instrument.format_stats(
+                instrument.rolling_stats(inst.buffer.latest()), self.inst_unit_var.get()))
+        if inst.running:
+            self.root.after(INSTRUMENT_REFRESH_MS, self._poll_instrument, inst)
+            return
+        self.instrument = None
+        self.inst_status_var.set(f"错误: {inst.error}" if inst.error else "数据流已结束")
+
+    def cancel_job(self, panel):
+        """取消某个面板的后台计算"""
+        if self.jobs.busy(panel):
+            self.jobs.cancel(panel)
+            if panel == 'nonlinear':
+                self.nl_result_var.set("已取消")
+                self.nl_progress['value'] = 0
+
+    def _job_failed(self, panel, exc):
+        if panel == 'nonlinear':
+            self.nl_result_var.set(f"错误: {exc}")
+            self.nl_progress['value'] = 0
+
+    def _on_close(self):
+        self.disconnect_instrument()
+        self.jobs.shutdown()
+        self.root.destroy()
+
+    def _create_conversion_row(self, parent, row, label, unit_def, unit_type, tag):
         """创建转换输入行"""
         ttk.Label(parent, text=label).grid(row=row, column=0, sticky='e', padx=5, pady=6)
         
@@ -235,141 +539,186 @@ class IntegratedOpticalCalculator:
             entry.bind('<FocusIn>', lambda e: self._set_delta_source(tag))
             cb.bind('<FocusIn>', lambda e: self._set_delta_source(tag))
         
-        entry.bind('<Return>', lambda e: self._trigger_calc(tag, callback))
-        cb.bind('<<ComboboxSelected>>', lambda e: self._trigger_calc(tag, callback))
+        entry.bind('<Return>', lambda e: self._trigger_calc(tag))
+        entry.bind('<KeyRelease>', lambda e: self._on_key(tag))
+        cb.bind('<<ComboboxSelected>>', lambda e: self._trigger_calc(tag))
         
         return var, u_var
 
+    def _build_graph(self):
+        """声明联动关系: 绝对值 -> (介质、空气) -> Delta -> 精确区间；绝对值 + 功率 -> 光子能量/通量"""
+        g = self.graph = Graph()
+        self.debouncer = Debouncer(self.root)
+        g.add(Choice('medium', self.medium_var))
+        g.add(Derived('air', self._air_env))
+        g.add(Group('abs', {
+            'f': Field(self.f_var, self.f_unit),
+            'l': Field(self.l_var, self.l_unit, self._l_to_si, self._l_from_si),
+            'k': Field(self.k_var, self.k_unit),
+        }, self._solve_abs))
+        g.add(Derived('itu', lambda a: itu_describe(a['f']) if a else "", ('abs',), sink=self.itu_var.set))
+        g.add(Derived('dispersion', self._medium_info, ('abs', 'medium'),
+                      sink=lambda v: self.medium_info_var.set(v[1])))
+        g.add(Derived('air_scale', self._air_scale, ('abs', 'air')))
+        g.add(Group('delta', {
+            'df': Field(self.df_var, self.df_unit),
+            'dl': Field(self.dl_var, self.dl_unit),
+            'dk': Field(self.dk_var, self.dk_unit),
+        }, self._solve_delta, depends=('abs', 'dispersion', 'air_scale'), source='dl'))
+        g.add(Derived('band', self._band_text, ('delta', 'abs', 'air_scale', 'air'), sink=self.band_var.set))
+        g.add(Group('power', {
+            'dbm': Field(self.p_dbm, 'dBm', power_to_mw, mw_to_power, '{:.3f}'),
+            'mw': Field(self.p_mw, 'mW', power_to_mw, mw_to_power, '{:.6f}'),
+            'w': Field(self.p_w, 'W', power_to_mw, mw_to_power, '{:.9f}'),
+        }, self._solve_power))
+        g.add(Derived('photon', self._photon_text, ('abs', 'power'), sink=self.photon_var.set))
+
     def _set_delta_source(self, tag):
         """设置delta源"""
-        self.last_delta_source = tag
+        self.graph['delta'].source = tag
 
-    def _trigger_calc(self, source_tag, func):
+    def _trigger_calc(self, source_tag):
         """触发计算"""
-        self.current_source = source_tag
-        if source_tag in ['df', 'dl', 'dk']:
-            self.last_delta_source = source_tag
-        func()
+        group = GROUPS[source_tag]
+        self.debouncer.cancel(group)
+        self.graph.edit(group, source_tag)
+
+    def _on_key(self, tag):
+        """实时模式: 内容有变化时延迟计算，连续按键只在停顿后计算一次；无效的中间输入被忽略"""
+        if not self.live_var.get():
+            return
+        group = GROUPS[tag]
+        if self.graph[group].fields[tag].changed():
+            self.debouncer.schedule(group, self._trigger_calc, tag)
 
-    def _get_si(self, var, unit_var, unit_type):
-        """获取SI单位值"""
+    def _on_reference_changed(self):
+        """波长基准或空气环境改变：保持频率与 Δf 不变，按新基准重新显示 λ 与 Δλ"""
+        self.graph['abs'].fields['l'].invalidate()
+        if self.graph['delta'].source == 'dl':
+            self.graph['delta'].source = 'df'
+        self.graph.mark('air')
+        self._trigger_calc('f')
+
+    def _on_air_env_changed(self):
+        if self._air_env() != self.graph.value('air'):
+            self._on_reference_changed()
+
+    def _air_env(self):
+        """基准为空气时返回环境参数 (T, P, RH, CO₂)，真空为 None；输入无效时沿用上一次的值"""
+        if self.l_ref_var.get() != AIR:
+            return None
         try:
-            val = float(var.get())
-            factor = UNIT_FACTORS[unit_type][unit_var.get()]
-            return val * factor
+            env = tuple(float(v) for v in self.air_env_var.get().replace(',', ' ').split())
         except ValueError:
-            return None
+            env = ()
+        if len(env) != 4:
+            return self.graph.value('air') or STANDARD_AIR
+        return env
 
-    def _set_val(self, var, unit_var, unit_type, si_val):
-        """设置显示值"""
-        if si_val is None:
-            var.set("")
-            return
-        factor = UNIT_FACTORS[unit_type][unit_var.get()]
-        var.set(f"{si_val / factor:.10g}")
+    def _l_to_si(self, value, unit):
+        """显示的波长 -> 真空波长 (SI)；基准为空气时先换算为真空波长"""
+        l_si = to_si(value, unit)
+        env = self.graph.value('air')
+        if l_si > 0 and env:
+            l_si = float(air_to_vacuum(l_si, env))     # 超出公式范围时为 NaN，精确区间处显示提示
+        return l_si
+
+    def _l_from_si(self, l_si, unit):
+        """真空波长 l_si -> 按当前波长基准显示的数值"""
+        env = self.graph.value('air')
+        if l_si > 0 and env:
+            l_si = vacuum_to_air(l_si, env)
+        return from_si(l_si, unit)
 
-    def _calc_abs(self):
+    @staticmethod
+    def _air_scale(abs_val, env):
+        """显示的 Δλ / 真空 Δλ：真空基准为 1，空气基准为中心波长处的 dλ_air/dλ_vac"""
+        if not env or not abs_val:
+            return 1.0
+        return float(air_width_factor(abs_val['l'], env))
+
+    @staticmethod
+    def _solve_abs(src, si):
         """计算绝对值"""
-        src = self.current_source
-        
-        f_si = self._get_si(self.f_var, self.f_unit, 'frequency')
-        l_si = self._get_si(self.l_var, self.l_unit, 'wavelength')
-        k_si = self._get_si(self.k_var, self.k_unit, 'wavenumber')
-        
-        try:
-            if src == 'f' and f_si:
-                l_si = C / f_si
-                k_si = 1.0 / l_si
-            elif src == 'l' and l_si:
-                f_si = C / l_si
-                k_si = 1.0 / l_si
-            elif src == 'k' and k_si:
-                l_si = 1.0 / k_si
-                f_si = C / l_si
-        except ZeroDivisionError:
-            return
-        
-        if src != 'f': self._set_val(self.f_var, self.f_unit, 'frequency', f_si)
-        if src != 'l': self._set_val(self.l_var, self.l_unit, 'wavelength', l_si)
-        if src != 'k': self._set_val(self.k_var, self.k_unit, 'wavenumber', k_si)
-        
-        # 更新Delta值
-        if l_si:
-            self.current_source = self.last_delta_source
-            self._calc_delta()
+        if not si:
+            return None
+        f_si, l_si, k_si = (float(v) for v in abs_si(src, si))
+        return {'f': f_si, 'l': l_si, 'k': k_si}
 
-    def _calc_delta(self):
-        """计算Delta值"""
-        base_l = self._get_si(self.l_var, self.l_unit, 'wavelength')
-        if not base_l:
-            return
-        
-        src = self.current_source
-        df_si = self._get_si(self.df_var, self.df_unit, 'frequency')
-        dl_si = self._get_si(self.dl_var, self.dl_unit, 'wavelength')
-        dk_si = self._get_si(self.dk_var, self.dk_unit, 'wavenumber')
-        
-        try:
-            if src == 'df' and df_si:
-                dl_si = (df_si * base_l**2) / C
-                dk_si = dl_si / base_l**2
-            elif src == 'dl' and dl_si:
-                df_si = (C * dl_si) / base_l**2
-                dk_si = dl_si / base_l**2
-            elif src == 'dk' and dk_si:
-                dl_si = dk_si * base_l**2
-                df_si = (C * dl_si) / base_l**2
-        except ZeroDivisionError:
-            return
-        
-        if src != 'df': self._set_val(self.df_var, self.df_unit, 'frequency', df_si)
-        if src != 'dl': self._set_val(self.dl_var, self.dl_unit, 'wavelength', dl_si)
-        if src != 'dk': self._set_val(self.dk_var, self.dk_unit, 'wavenumber', dk_si)
+    @staticmethod
+    def _solve_delta(src, si, abs_val, disp, scale):
+        """计算Delta值 (介质中 Δk 按群折射率换算；Δλ 按 scale 显示为当前基准下的宽度)"""
+        if not si or not abs_val:
+            return None
+        if src == 'dl':
+            si /= scale
+        df_si, dl_si, dk_si = (float(v) for v in delta_si(src, si, abs_val['l'], disp[0]))
+        return {'df': df_si, 'dl': dl_si * scale, 'dk': dk_si}
+
+    def _band_text(self, delta_val, abs_val, scale, env):
+        if env and abs_val and not np.isfinite(scale):
+            return OUT_OF_RANGE
+        if not delta_val or not abs_val:
+            return ""
+        # 精确区间按输入所在的域取对称区间 (Δk 与 Δf 在真空中成正比，按 Δf 处理)
+        band_src = 'dl' if self.graph['delta'].source == 'dl' else 'df'
+        band_si = delta_val[band_src] / scale if band_src == 'dl' else delta_val[band_src]
+        if not band_si:
+            return ""
+        return describe_band(band_src, band_si, abs_val['l'], title="精确区间 (真空)" if env else "精确区间")
+
+    @staticmethod
+    def _medium_info(abs_val, material):
+        """当前介质在中心波长处的 (群折射率, 色散参数说明)，真空为 (1, "")"""
+        if material == VACUUM or not abs_val:
+            return 1.0, ""
+        base_l = abs_val['l']
+        n, n_g, beta2 = (float(v) for v in dispersion.evaluate(material, base_l))
+        return n_g, (f"n = {n:.6f}   n_g = {n_g:.6f}\n"
+                     f"λ/n = {base_l / n * 1e9:.4f} nm   GVD = {beta2 * 1e27:.4g} fs²/mm")
 
     def calculate_fiber_coupling(self):
         """计算光纤耦合焦距"""
         try:
-            # 获取输入值并转换单位到米
-            λ = float(self.wavelength_entry.get()) * 1e-9   # nm → m
-            D = float(self.spot_entry.get()) * 1e-3         # mm → m
-            MFD = float(self.mfd_entry.get()) * 1e-6        # μm → m
-            
-            # 执行计算
-            f = (math.pi * D * MFD) / (4 * λ)
-            
-            # 转换结果为毫米并显示
-            self.fiber_result_var.set(f"所需焦距: {f*1e3:.3f} mm")
-        except ValueError:
-            self.fiber_result_var.set("错误: 请输入有效的数字")
-        except ZeroDivisionError:
-            self.fiber_result_var.set("错误: 波长不能为零")
+            # 输入解析与计算在 coupling 中 (与耦合头焦距计算器共用)
+            options = {key: entry.get() for key, entry in self.coupling_option_entries.items()}
+            f, text = coupling_from_inputs(self.wavelength_entry.get(), self.spot_entry.get(),
+                                           self.mfd_entry.get(), options)
+            self.fiber_result_var.set(text + self._nearest_lens_text(f))
+        except ValueError as e:
+            self.fiber_result_var.set(f"错误: {e}")
 
-    def _calc_power(self):
-        """功率转换计算"""
+    def _nearest_lens_text(self, f, k=3):
+        """本地透镜目录中最近的 k 个库存焦距 (目录不存在时为空)"""
         try:
-            # 获取当前活动的输入框
-            if self.p_dbm.get():
-                dbm = float(self.p_dbm.get())
-                mw = 10**(dbm/10)
-                w = mw / 1000
-                self.p_mw.set(f"{mw:.6f}")
-                self.p_w.set(f"{w:.9f}")
-            elif self.p_mw.get():
-                mw = float(self.p_mw.get())
-                dbm = 10 * math.log10(mw)
-                w = mw / 1000
-                self.p_dbm.set(f"{dbm:.3f}")
-                self.p_w.set(f"{w:.9f}")
-            elif self.p_w.get():
-                w = float(self.p_w.get())
-                mw = w * 1000
-                dbm = 10 * math.log10(mw)
-                self.p_dbm.set(f"{dbm:.3f}")
-                self.p_mw.set(f"{mw:.6f}")
-        except ValueError:
-            pass
-        except ZeroDivisionError:
-            pass
+            catalog = default_catalog()
+        except (OSError, ValueError):
+            return ""
+        if not catalog:
+            return ""
+        idx, f_stock, eta = catalog.nearest(f, k)
+        lines = [f"{catalog.part[i]}: {fs*1e3:.2f} mm (η={e*100:.1f}%)"
+                 for i, fs, e in zip(idx, f_stock, eta)]
+        return "\n库存透镜:\n" + "\n".join(lines)
+
+    @staticmethod
+    def _solve_power(src, mw):
+        """功率转换计算，组内统一以 mW 表示"""
+        if mw is None:
+            return None
+        return {'dbm': mw, 'mw': mw, 'w': mw}
+
+    @staticmethod
+    def _photon_text(abs_val, power_val):
+        """根据当前波长与功率显示光子能量和光子通量"""
+        if not abs_val or abs_val['l'] < 0:
+            return ""
+        l_si = abs_val['l']
+        _, e_ev = photon_energy(l_si, 'm')
+        text = f"光子能量: {e_ev:.6g} eV"
+        if power_val:
+            text += f"\n光子通量: {photon_flux(power_val['mw'], l_si, 'mW', 'm'):.4g} 个/s"
+        return text
 
 if __name__ == "__main__":
     root = tk.Tk()
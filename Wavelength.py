@@ -1,30 +1,30 @@
+import math
 import tkinter as tk
 from tkinter import ttk
-import math
 
-# --- 常量定义 ---
-C = 299_792_458.0  # 光速 m/s
+# 常量、单位与向量化公式统一定义在 waveconvert 中 (GUI 与批处理共用)
+from waveconvert import UNIT_FACTORS, abs_si, delta_si, describe_band, from_si, mw_to_power, power_to_mw, to_si
+from airvacuum import OUT_OF_RANGE, STANDARD_AIR, air_to_vacuum, air_width_factor, vacuum_to_air
+from itugrid import describe as itu_describe
+from calcgraph import Debouncer, Derived, Field, Graph, Group
 
-# 单位换算因子
-UNIT_FACTORS = {
-    'frequency': {'Hz': 1, 'MHz': 1e6, 'GHz': 1e9, 'THz': 1e12},
-    'wavelength': {'m': 1, 'mm': 1e-3, 'µm': 1e-6, 'nm': 1e-9, 'pm': 1e-12},
-    'wavenumber': {'1/m': 1, '1/cm': 1e2},
-}
+# 输入框 tag -> 所属的联动组
+GROUPS = {'f': 'abs', 'l': 'abs', 'k': 'abs', 'df': 'delta', 'dl': 'delta', 'dk': 'delta',
+          'dbm': 'power', 'mw': 'power', 'w': 'power'}
+
+VACUUM = '真空'
+AIR = '空气'
 
 class SyncConverterApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("光电计算器 (自动联动版)")
-        self.geometry("720x450")
+        self.geometry("860x540")
         self.resizable(False, False)
         
-        # 状态变量
-        self.current_source = None       # 当前正在计算的触发源
-        self.last_delta_source = 'dl'    # 记住最后一次操作的 Delta 栏位，默认以波长(dl)为基准
-        
         self._setup_styles()
         self._build_ui()
+        self._build_graph()
         
         # 初始化默认值
         self.l_var.set("532")
@@ -34,7 +34,7 @@ class SyncConverterApp(tk.Tk):
         self.dl_unit.set("nm")
         
         # 触发初始计算
-        self._trigger_calc('l', self._calc_abs)
+        self._trigger_calc('l')
 
     def _setup_styles(self):
         style = ttk.Style(self)
@@ -56,17 +56,32 @@ class SyncConverterApp(tk.Tk):
         abs_frame = ttk.LabelFrame(left_panel, text="1. 中心波长/频率 (绝对值)", style='Header.TLabelframe', padding=10)
         abs_frame.pack(fill='x', pady=(0, 15))
         
-        self.f_var, self.f_unit = self._create_row(abs_frame, 0, "频率 (Freq):", 'THz', 'frequency', 'f', self._calc_abs)
-        self.l_var, self.l_unit = self._create_row(abs_frame, 1, "波长 (Wave):", 'nm', 'wavelength', 'l', self._calc_abs)
-        self.k_var, self.k_unit = self._create_row(abs_frame, 2, "波数 (k):", '1/cm', 'wavenumber', 'k', self._calc_abs)
+        self.f_var, self.f_unit = self._create_row(abs_frame, 0, "频率 (Freq):", 'THz', 'frequency', 'f')
+        self.l_var, self.l_unit = self._create_row(abs_frame, 1, "波长 (Wave):", 'nm', 'wavelength', 'l')
+        self.k_var, self.k_unit = self._create_row(abs_frame, 2, "波数 (k):", '1/cm', 'wavenumber', 'k')
+
+        # ITU 信道 (显示在频率/波长旁)
+        self.itu_var = tk.StringVar()
+        ttk.Label(abs_frame, textvariable=self.itu_var, foreground='#2E86AB').grid(row=0, column=3, rowspan=2, sticky='w')
+
+        # 波长基准: 空气按标准空气 (15 °C, 101325 Pa, 干燥, 450 ppm CO₂)，λ 与 Δλ 均显示空气值
+        ttk.Label(abs_frame, text="波长基准:").grid(row=3, column=0, sticky='e', padx=5, pady=5)
+        self.l_ref_var = tk.StringVar(value=VACUUM)
+        ref_cb = ttk.Combobox(abs_frame, textvariable=self.l_ref_var, values=[VACUUM, AIR], width=6, state='readonly')
+        ref_cb.grid(row=3, column=1, sticky='w', padx=5, pady=5)
+        ref_cb.bind('<<ComboboxSelected>>', lambda e: self._on_reference_changed())
 
         # 2. 变化量 (Delta)
         delta_frame = ttk.LabelFrame(left_panel, text="2. 线宽/带宽 (Delta Δ)", style='Header.TLabelframe', padding=10)
         delta_frame.pack(fill='x')
         
-        self.df_var, self.df_unit = self._create_row(delta_frame, 0, "Δ 频率:", 'GHz', 'frequency', 'df', self._calc_delta)
-        self.dl_var, self.dl_unit = self._create_row(delta_frame, 1, "Δ 波长:", 'nm', 'wavelength', 'dl', self._calc_delta)
-        self.dk_var, self.dk_unit = self._create_row(delta_frame, 2, "Δ 波数:", '1/cm', 'wavenumber', 'dk', self._calc_delta)
+        self.df_var, self.df_unit = self._create_row(delta_frame, 0, "Δ 频率:", 'GHz', 'frequency', 'df')
+        self.dl_var, self.dl_unit = self._create_row(delta_frame, 1, "Δ 波长:", 'nm', 'wavelength', 'dl')
+        self.dk_var, self.dk_unit = self._create_row(delta_frame, 2, "Δ 波数:", '1/cm', 'wavenumber', 'dk')
+
+        # 精确区间 (端点逐一换算，宽带时一阶公式误差过大会标 ⚠)
+        self.band_var = tk.StringVar()
+        ttk.Label(delta_frame, textvariable=self.band_var, foreground='gray', justify='left').grid(row=3, column=0, columnspan=3, sticky='w', padx=5)
 
         # === 右侧面板 ===
         right_panel = ttk.Frame(main)
@@ -79,16 +94,22 @@ class SyncConverterApp(tk.Tk):
         self.p_mw  = self._create_power_row(pow_frame, 1, "mW:", 'mw')
         self.p_w   = self._create_power_row(pow_frame, 2, "W:", 'w')
 
+        # 实时计算开关 (关闭后仅在按 Enter 时计算)
+        self.live_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(right_panel, text="实时计算 (输入时自动联动)", variable=self.live_var).pack(anchor='w', pady=(10, 0))
+
         # 说明文字
         info_text = (
             "逻辑说明:\n"
             "• 修改 [中心波长] 会同步更新 [Δ Delta]。\n"
-            "  (因为转换系数依赖于中心波长)\n\n"
-            "• 操作方式：输入数值 -> 按 Enter。"
+            "  (因为转换系数依赖于中心波长)\n"
+            "• 波长基准选空气时，λ 与 Δλ 为空气值。\n\n"
+            "• 操作方式：输入数值即自动计算；\n"
+            "  关闭实时计算后输入数值 -> 按 Enter。"
         )
         ttk.Label(right_panel, text=info_text, foreground="gray", justify="left").pack(side='bottom', anchor='sw', pady=10)
 
-    def _create_row(self, parent, row, label, unit_def, unit_type, tag, callback):
+    def _create_row(self, parent, row, label, unit_def, unit_type, tag):
         ttk.Label(parent, text=label).grid(row=row, column=0, sticky='e', padx=5, pady=5)
         
         var = tk.StringVar()
@@ -106,8 +127,9 @@ class SyncConverterApp(tk.Tk):
             entry.bind('<FocusIn>', lambda e: self._set_delta_source(tag))
             cb.bind('<FocusIn>', lambda e: self._set_delta_source(tag))
 
-        entry.bind('<Return>', lambda e: self._trigger_calc(tag, callback))
-        cb.bind('<<ComboboxSelected>>', lambda e: self._trigger_calc(tag, callback))
+        entry.bind('<Return>', lambda e: self._trigger_calc(tag))
+        entry.bind('<KeyRelease>', lambda e: self._on_key(tag))
+        cb.bind('<<ComboboxSelected>>', lambda e: self._trigger_calc(tag))
         
         return var, u_var
 
@@ -116,129 +138,119 @@ class SyncConverterApp(tk.Tk):
         var = tk.StringVar()
         entry = ttk.Entry(parent, textvariable=var, width=15, justify='right')
         entry.grid(row=row, column=1, sticky='ew', padx=5, pady=8)
-        entry.bind('<Return>', lambda e: self._trigger_calc(tag, self._calc_power))
+        entry.bind('<Return>', lambda e: self._trigger_calc(tag))
+        entry.bind('<KeyRelease>', lambda e: self._on_key(tag))
         return var
 
+    def _build_graph(self):
+        """声明各栏位之间的依赖关系: 绝对值 -> (空气) -> Delta -> 精确区间，功率独立"""
+        g = self.graph = Graph()
+        self.debouncer = Debouncer(self)
+        g.add(Derived('air', lambda: STANDARD_AIR if self.l_ref_var.get() == AIR else None))
+        g.add(Group('abs', {
+            'f': Field(self.f_var, self.f_unit),
+            'l': Field(self.l_var, self.l_unit, self._l_to_si, self._l_from_si),
+            'k': Field(self.k_var, self.k_unit),
+        }, self._solve_abs))
+        g.add(Derived('itu', lambda a: itu_describe(a['f']) if a else "", ('abs',), sink=self.itu_var.set))
+        g.add(Derived('air_scale', self._air_scale, ('abs', 'air')))
+        # Delta 依赖中心波长：绝对值改变时，以最后操作过的 Delta 栏位为基准重算其余两栏
+        g.add(Group('delta', {
+            'df': Field(self.df_var, self.df_unit),
+            'dl': Field(self.dl_var, self.dl_unit),
+            'dk': Field(self.dk_var, self.dk_unit),
+        }, self._solve_delta, depends=('abs', 'air_scale'), source='dl'))
+        g.add(Derived('band', self._band_text, ('delta', 'abs', 'air_scale', 'air'), sink=self.band_var.set))
+        g.add(Group('power', {
+            'dbm': Field(self.p_dbm, 'dBm', power_to_mw, mw_to_power, '{:.4f}'),
+            'mw': Field(self.p_mw, 'mW', power_to_mw, mw_to_power, '{:.6g}'),
+            'w': Field(self.p_w, 'W', power_to_mw, mw_to_power, '{:.6g}'),
+        }, self._solve_power))
+
     def _set_delta_source(self, tag):
-        self.last_delta_source = tag
-
-    def _trigger_calc(self, source_tag, func):
-        self.current_source = source_tag
-        # 如果用户手动修改了 Delta 栏位，更新 last_delta_source
-        if source_tag in ['df', 'dl', 'dk']:
-            self.last_delta_source = source_tag
-        func()
-
-    # --- 核心计算逻辑 ---
-
-    def _get_si(self, var, unit_var, unit_type):
-        try:
-            val = float(var.get())
-            factor = UNIT_FACTORS[unit_type][unit_var.get()]
-            return val * factor
-        except ValueError:
-            return None
+        # FocusIn: 记住如果是 Delta 栏位被选中，它就是下一次联动的基准
+        self.graph['delta'].source = tag
 
-    def _set_val(self, var, unit_var, unit_type, si_val):
-        if si_val is None:
-            var.set("")
-            return
-        factor = UNIT_FACTORS[unit_type][unit_var.get()]
-        # 智能格式化：根据数值大小决定显示精度
-        var.set(f"{si_val / factor:.10g}")
+    def _trigger_calc(self, source_tag):
+        group = GROUPS[source_tag]
+        self.debouncer.cancel(group)
+        self.graph.edit(group, source_tag)
 
-    def _calc_abs(self):
-        """计算绝对值，并触发 Delta 更新"""
-        src = self.current_source
-        
-        f_si = self._get_si(self.f_var, self.f_unit, 'frequency')
-        l_si = self._get_si(self.l_var, self.l_unit, 'wavelength')
-        k_si = self._get_si(self.k_var, self.k_unit, 'wavenumber')
-
-        try:
-            if src == 'f' and f_si:
-                l_si = C / f_si
-                k_si = 1.0 / l_si
-            elif src == 'l' and l_si:
-                f_si = C / l_si
-                k_si = 1.0 / l_si
-            elif src == 'k' and k_si:
-                l_si = 1.0 / k_si
-                f_si = C / l_si
-        except ZeroDivisionError:
+    def _on_key(self, tag):
+        # 实时模式: 内容有变化才计算，连续按键只在停顿后算一次；无效的中间输入 (如 "1e") 被忽略
+        if not self.live_var.get():
             return
-
-        if src != 'f': self._set_val(self.f_var, self.f_unit, 'frequency', f_si)
-        if src != 'l': self._set_val(self.l_var, self.l_unit, 'wavelength', l_si)
-        if src != 'k': self._set_val(self.k_var, self.k_unit, 'wavenumber', k_si)
-
-        # === 关键点：绝对值更新后，必须刷新 Delta ===
-        # 我们假装用户刚刚按下了"最后操作过的那个Delta输入框"的回车
-        # 这样可以保持那个数值不变，重新计算其他的 Delta
-        if l_si: # 只有在波长有效时才联动
-            self.current_source = self.last_delta_source 
-            self._calc_delta()
-
-    def _calc_delta(self):
+        group = GROUPS[tag]
+        if self.graph[group].fields[tag].changed():
+            self.debouncer.schedule(group, self._trigger_calc, tag)
+
+    def _on_reference_changed(self):
+        # 波长基准切换：保持频率与 Δf 不变，按新基准重新显示 λ 与 Δλ
+        self.graph['abs'].fields['l'].invalidate()
+        if self.graph['delta'].source == 'dl':
+            self.graph['delta'].source = 'df'
+        self.graph.mark('air')
+        self._trigger_calc('f')
+
+    def _l_to_si(self, value, unit):
+        # 显示的波长 -> 真空波长 (SI)
+        l_si = to_si(value, unit)
+        env = self.graph.value('air')
+        if l_si > 0 and env:
+            l_si = float(air_to_vacuum(l_si, env))     # 超出公式范围时为 NaN，精确区间处显示提示
+        return l_si
+
+    def _l_from_si(self, l_si, unit):
+        env = self.graph.value('air')
+        return from_si(vacuum_to_air(l_si, env) if l_si > 0 and env else l_si, unit)
+
+    # --- 核心计算逻辑 (SI 单位，由依赖图调用) ---
+
+    @staticmethod
+    def _solve_abs(src, si):
+        if not si:
+            return None
+        f_si, l_si, k_si = (float(v) for v in abs_si(src, si))
+        return {'f': f_si, 'l': l_si, 'k': k_si}
+
+    @staticmethod
+    def _air_scale(abs_val, env):
+        # 显示的 Δλ / 真空 Δλ (空气基准时为 dλ_air/dλ_vac)
+        if not env or not abs_val:
+            return 1.0
+        return float(air_width_factor(abs_val['l'], env))
+
+    @staticmethod
+    def _solve_delta(src, si, abs_val, scale):
         """计算 Delta，依赖当前的绝对波长"""
-        # 获取当前的中心波长 (绝对值)
-        base_l = self._get_si(self.l_var, self.l_unit, 'wavelength')
-        
         # 如果中心波长为空，无法进行物理转换
-        if not base_l: 
-            return
-
-        src = self.current_source
-        
-        # 读取各个 Delta 的值
-        df_si = self._get_si(self.df_var, self.df_unit, 'frequency')
-        dl_si = self._get_si(self.dl_var, self.dl_unit, 'wavelength')
-        dk_si = self._get_si(self.dk_var, self.dk_unit, 'wavenumber')
-
-        try:
-            # 物理公式: |df| = (c / lambda^2) * |dl|
-            #          |dk| = |dl| / lambda^2
-            if src == 'df' and df_si is not None:
-                dl_si = (base_l**2 / C) * df_si
-                dk_si = df_si / C
-            elif src == 'dl' and dl_si is not None:
-                df_si = (C / base_l**2) * dl_si
-                dk_si = dl_si / (base_l**2)
-            elif src == 'dk' and dk_si is not None:
-                df_si = dk_si * C
-                dl_si = dk_si * (base_l**2)
-        except ZeroDivisionError:
-            return
-
-        if src != 'df': self._set_val(self.df_var, self.df_unit, 'frequency', df_si)
-        if src != 'dl': self._set_val(self.dl_var, self.dl_unit, 'wavelength', dl_si)
-        if src != 'dk': self._set_val(self.dk_var, self.dk_unit, 'wavenumber', dk_si)
-
-    def _calc_power(self):
-        """功率计算 (独立模块)"""
-        src = self.current_source
-        mw = None
-        try:
-            if src == 'dbm':
-                val = float(self.p_dbm.get())
-                mw = 10 ** (val / 10.0)
-            elif src == 'mw':
-                mw = float(self.p_mw.get())
-            elif src == 'w':
-                val = float(self.p_w.get())
-                mw = val * 1000.0
-        except ValueError:
-            return
-
-        if mw is None: return
-
-        if src != 'dbm':
-            val_dbm = 10 * math.log10(mw) if mw > 0 else -100.0
-            self.p_dbm.set(f"{val_dbm:.4f}")
-        if src != 'mw':
-            self.p_mw.set(f"{mw:.6g}")
-        if src != 'w':
-            self.p_w.set(f"{mw/1000.0:.6g}")
+        if si is None or not abs_val:
+            return None
+        if src == 'dl':
+            si /= scale
+        # 物理公式: |df| = (c / lambda^2) * |dl|
+        #          |dk| = |dl| / lambda^2
+        df_si, dl_si, dk_si = (float(v) for v in delta_si(src, si, abs_val['l']))
+        return {'df': df_si, 'dl': dl_si * scale, 'dk': dk_si}
+
+    def _band_text(self, delta_val, abs_val, scale, env):
+        if env and abs_val and not math.isfinite(scale):
+            return OUT_OF_RANGE
+        if not delta_val or not abs_val:
+            return ""
+        # 精确区间按输入所在的域取对称区间 (Δk 与 Δf 在真空中成正比，按 Δf 处理)，端点为真空值
+        band_src = 'dl' if self.graph['delta'].source == 'dl' else 'df'
+        band_si = delta_val[band_src] / scale if band_src == 'dl' else delta_val[band_src]
+        if not band_si:
+            return ""
+        return describe_band(band_src, band_si, abs_val['l'], title="精确区间 (真空)" if env else "精确区间")
+
+    @staticmethod
+    def _solve_power(src, mw):
+        """功率计算 (独立模块)，组内统一以 mW 表示"""
+        if mw is None:
+            return None
+        return {'dbm': mw, 'mw': mw, 'w': mw}
 
 if __name__ == '__main__':
     app = SyncConverterApp()
@@ -0,0 +1,87 @@
+"""ABCD 矩阵高斯光束传播 (批量)
+
+光学系统是元件序列，每个元件的参数可以是数组 (一组配置)，矩阵堆叠成 (..., 2, 2)
+后用 np.matmul 批量相乘；复 q 参数同样可以是数组 (一组光束)，两者按广播规则组合。
+
+元件:
+    ('space', d)            自由传播距离 d (m)
+    ('lens', f)             薄透镜焦距 f (m)
+    ('interface', n1, n2)   平面界面 n1 -> n2
+    ('curved', R, n1, n2)   球面界面，曲率半径 R (m)，凸面朝向入射光为正
+"""
+import numpy as np
+
+
+def element_matrix(kind, *params):
+    """单个元件的 ABCD 矩阵，形状 (..., 2, 2)"""
+    params = [np.asarray(p, dtype=float) for p in params]
+    shape = np.broadcast_shapes(*(p.shape for p in params))
+    one, zero = np.ones(shape), np.zeros(shape)
+    if kind == 'space':
+        d, = params
+        m = [[one, d], [zero, one]]
+    elif kind == 'lens':
+        f, = params
+        m = [[one, zero], [-1.0 / f, one]]
+    elif kind == 'interface':
+        n1, n2 = params
+        m = [[one, zero], [zero, n1 / n2 + zero]]
+    elif kind == 'curved':
+        r, n1, n2 = params
+        m = [[one, zero], [(n1 - n2) / (r * n2) + zero, n1 / n2 + zero]]
+    else:
+        raise ValueError(f"未知元件类型: {kind}")
+    return np.stack([np.stack(row, axis=-1) for row in m], axis=-2)
+
+
+def system_matrix(elements):
+    """按光路顺序的元件序列 -> 总矩阵 M = M_N ··· M_2 · M_1"""
+    total = np.eye(2)
+    for kind, *params in elements:
+        total = np.matmul(element_matrix(kind, *params), total)
+    return total
+
+
+def apply_abcd(q, m):
+    """q' = (Aq + B) / (Cq + D)"""
+    q = np.asarray(q, dtype=complex)
+    a, b, c, d = m[..., 0, 0], m[..., 0, 1], m[..., 1, 0], m[..., 1, 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (a * q + b) / (c * q + d)
+
+
+def propagate(q, elements):
+    """让 (一组) 光束的 q 参数通过元件序列"""
+    return apply_abcd(q, system_matrix(elements))
+
+
+def q_from_waist(w0, wavelength, z=0.0, n=1.0):
+    """束腰半径 w0 (m)、距束腰 z 处的 q 参数"""
+    w0 = np.asarray(w0, dtype=float)
+    return np.asarray(z, dtype=float) + 1j * np.pi * w0 ** 2 * n / np.asarray(wavelength, dtype=float)
+
+
+def q_collimated(diameter, wavelength, n=1.0):
+    """1/e² 直径为 D 的准直光束 (束腰位于当前位置)"""
+    return q_from_waist(np.asarray(diameter, dtype=float) / 2, wavelength, 0.0, n)
+
+
+def beam_params(q, wavelength, n=1.0):
+    """由 q 计算光束参数，返回字典 (单位 m):
+    w 当前光斑半径, R 波前曲率半径, w0 束腰半径, z_waist 到束腰的距离 (正值表示束腰在前方)
+    """
+    q = np.asarray(q, dtype=complex)
+    wavelength = np.asarray(wavelength, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv = 1.0 / q
+        w = np.sqrt(-wavelength / (np.pi * n * inv.imag))
+        r = 1.0 / inv.real
+        w0 = np.sqrt(q.imag * wavelength / (np.pi * n))
+    return {'w': w, 'R': r, 'w0': w0, 'z_waist': -q.real}
+
+
+def focus_to_fiber(wavelength, diameter, focal, distance):
+    """准直光束经透镜后传播 distance 到达光纤端面，返回端面处的光束参数"""
+    q = q_collimated(diameter, wavelength)
+    q_out = propagate(q, [('lens', focal), ('space', distance)])
+    return beam_params(q_out, wavelength)
@@ -0,0 +1,139 @@
+"""空气 / 真空波长转换 (Ciddor 1996，可选 Edlén/Birch & Downs 1994)
+
+环境参数: 温度 (°C)、气压 (Pa)、相对湿度 (0~1)、CO₂ 浓度 (ppm)。
+每组环境参数下的 (n − 1)(σ) 在密集波数网格上预先计算并缓存 (lru_cache)，
+对数百万条谱线用 np.interp 查表；公式适用范围 (0.2 ~ 20 µm) 之外为 NaN。
+波长参数统一为 SI 单位 (m)，λ_air = λ_vac / n(λ_vac)。
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from waveconvert import convert_abs, from_si, to_si, unit_type
+
+# IAU/Ciddor 标准空气: 15 °C, 101325 Pa, 干燥, 450 ppm CO₂
+STANDARD_AIR = (15.0, 101325.0, 0.0, 450.0)
+METHODS = ('ciddor', 'edlen')
+OUT_OF_RANGE = "超出空气折射率公式范围 (真空波长 0.2 ~ 20 µm)"
+
+_R = 8.314510           # 气体常数 J/(mol·K)
+_MW = 0.018015          # 水的摩尔质量 kg/mol
+TABLE_SIGMA = (0.05, 5.0)   # 查表范围 σ = 1/λ_vac (µm⁻¹)，即 0.2 ~ 20 µm，同时也是公式的适用范围
+TABLE_POINTS = 16384
+
+
+def _compressibility(p, t_k, xw):
+    t = t_k - 273.15
+    pt = p / t_k
+    return (1 - pt * (1.58123e-6 - 2.9331e-8 * t + 1.1043e-10 * t ** 2
+                      + (5.707e-6 - 2.051e-8 * t) * xw + (1.9898e-4 - 2.376e-6 * t) * xw ** 2)
+            + pt ** 2 * (1.83e-11 - 0.765e-8 * xw ** 2))
+
+
+def _ciddor_factors(temp, pressure, humidity, co2):
+    """Ciddor 公式中只与环境有关的部分: (干空气系数, 水汽系数, CO₂ 修正)"""
+    t_k = temp + 273.15
+    svp = np.exp(1.2378847e-5 * t_k ** 2 - 1.9121316e-2 * t_k + 33.93711047 - 6.3431645e3 / t_k)
+    f = 1.00062 + 3.14e-8 * pressure + 5.6e-7 * temp ** 2
+    xw = f * humidity * svp / pressure
+    ma = 1e-3 * (28.9635 + 12.011e-6 * (co2 - 400))
+    rho_axs = 101325 * ma / (_compressibility(101325, 288.15, 0) * _R * 288.15)
+    rho_ws = 1333 * _MW / (_compressibility(1333, 293.15, 1) * _R * 293.15)
+    z = _compressibility(pressure, t_k, xw)
+    rho_a = pressure * ma * (1 - xw) / (z * _R * t_k)
+    rho_w = pressure * _MW * xw / (z * _R * t_k)
+    return rho_a / rho_axs, rho_w / rho_ws, 1 + 0.534e-6 * (co2 - 450)
+
+
+def _ciddor(s2, env):
+    a, w, co2_corr = _ciddor_factors(*env)
+    n_as = 1e-8 * (5792105 / (238.0185 - s2) + 167917 / (57.362 - s2))
+    n_ws = 1.022e-8 * (295.235 + 2.6422 * s2 - 0.032380 * s2 ** 2 + 0.004028 * s2 ** 3)
+    return a * n_as * co2_corr + w * n_ws
+
+
+def _edlen(s2, env):
+    """Birch & Downs (1994) 修正的 Edlén 公式 (不含 CO₂ 项，按 450 ppm 标定)"""
+    temp, pressure, humidity, _ = env
+    n_s = 1e-8 * (8342.54 + 2406147 / (130 - s2) + 15998 / (38.9 - s2))
+    n_tp = pressure * n_s / 96095.43 * (1 + 1e-8 * (0.601 - 0.00972 * temp) * pressure) \
+        / (1 + 0.0036610 * temp)
+    t_k = temp + 273.15
+    svp = np.exp(1.2378847e-5 * t_k ** 2 - 1.9121316e-2 * t_k + 33.93711047 - 6.3431645e3 / t_k)
+    return n_tp - humidity * svp * (3.7345 - 0.0401 * s2) * 1e-10
+
+
+def _in_range(sigma):
+    return (sigma >= TABLE_SIGMA[0] * (1 - 1e-12)) & (sigma <= TABLE_SIGMA[1] * (1 + 1e-12))
+
+
+def refractivity(vacuum_wavelength, env=STANDARD_AIR, method='ciddor'):
+    """空气折射率 n − 1 (直接按公式计算)，vacuum_wavelength 单位 m
+
+    超出 0.2 ~ 20 µm 时为 NaN (公式在约 132 nm、65 nm 处有极点，范围外的结果没有意义)。
+    """
+    with np.errstate(divide='ignore'):
+        sigma = 1e-6 / np.asarray(vacuum_wavelength, dtype=float)      # µm⁻¹
+    valid = _in_range(sigma)
+    return np.where(valid, _refractivity_sigma(np.where(valid, sigma, TABLE_SIGMA[0]), env, method), np.nan)
+
+
+def _refractivity_sigma(sigma, env, method):
+    """按波数 σ (µm⁻¹) 直接计算 n − 1，不检查范围"""
+    if method not in METHODS:
+        raise ValueError(f"未知方法: {method}")
+    return (_ciddor if method == 'ciddor' else _edlen)(sigma ** 2, tuple(float(v) for v in env))
+
+
+@lru_cache(maxsize=64)
+def refractivity_table(env=STANDARD_AIR, method='ciddor'):
+    """某一环境下 (σ 网格, n − 1) 的密集表格，按环境参数缓存"""
+    sigma = np.linspace(*TABLE_SIGMA, TABLE_POINTS)
+    table = _refractivity_sigma(sigma, env, method)
+    sigma.setflags(write=False)
+    table.setflags(write=False)
+    return sigma, table
+
+
+def _refractivity_lookup(vacuum_wavelength, env, method):
+    env = tuple(float(v) for v in env)
+    sigma_grid, table = refractivity_table(env, method)
+    lam = np.asarray(vacuum_wavelength, dtype=float)
+    with np.errstate(divide='ignore'):
+        sigma = 1e-6 / lam
+    out = np.interp(sigma, sigma_grid, table)
+    # 表格即覆盖公式的适用范围，范围外为 NaN
+    return np.where(_in_range(sigma), out, np.nan)
+
+
+def vacuum_to_air(wavelength, env=STANDARD_AIR, method='ciddor'):
+    """真空波长 -> 空气波长 (m)"""
+    lam = np.asarray(wavelength, dtype=float)
+    return lam / (1 + _refractivity_lookup(lam, env, method))
+
+
+def air_to_vacuum(wavelength, env=STANDARD_AIR, method='ciddor', iterations=3):
+    """空气波长 -> 真空波长 (m)；n 依赖真空波长，用不动点迭代 (3 次即达双精度)"""
+    lam_air = np.asarray(wavelength, dtype=float)
+    lam = lam_air
+    for _ in range(iterations):
+        lam = lam_air * (1 + _refractivity_lookup(lam, env, method))
+    return lam
+
+
+def air_width_factor(vacuum_wavelength, env=STANDARD_AIR, method='ciddor'):
+    """dλ_air / dλ_vac: 中心真空波长处的窄区间宽度 (Δλ) 由真空换算为空气的系数 (中心差分)"""
+    lam = np.asarray(vacuum_wavelength, dtype=float)
+    h = lam * 1e-6
+    return (vacuum_to_air(lam + h, env, method) - vacuum_to_air(lam - h, env, method)) / (2 * h)
+
+
+def convert_abs_air(values, from_unit, to_unit, air_in=False, air_out=False,
+                    env=STANDARD_AIR, method='ciddor'):
+    """绝对值转换，输入/输出的波长可分别按空气波长解释 (频率、波数始终为真空值)"""
+    if air_in and unit_type(from_unit) == 'wavelength':
+        values = air_to_vacuum(to_si(values, from_unit), env, method)
+        from_unit = 'm'
+    if air_out and unit_type(to_unit) == 'wavelength':
+        return from_si(vacuum_to_air(convert_abs(values, from_unit, 'm'), env, method), to_unit)
+    return convert_abs(values, from_unit, to_unit)
@@ -0,0 +1,126 @@
+"""二进制光谱横轴的内存映射转换 (.npy / 原始 float64)
+
+以 memmap 方式打开文件，按块把横轴从一种单位改写为另一种 (如 nm -> THz -> 1/cm)，
+可原位修改，也可写入新的映射文件；不会把整个文件读入内存。
+
+示例:
+    python axisconvert.py spectrum.npy nm THz --in-place
+    python axisconvert.py data.f64 nm 1/cm --raw-columns 2 -o data_k.f64
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from waveconvert import convert_abs, unit_type
+
+DEFAULT_CHUNK_ROWS = 1 << 20
+
+
+def open_axis_file(path, mode='r+', raw_columns=None):
+    """打开 .npy 或原始 float64 文件为 memmap；raw_columns 给出原始文件每行的列数"""
+    if raw_columns is None:
+        mm = np.load(path, mmap_mode=mode)
+    else:
+        itemsize = np.dtype(np.float64).itemsize
+        rows, rest = divmod(os.path.getsize(path), itemsize * raw_columns)
+        if rest:
+            raise ValueError(f"文件大小不是 {raw_columns} 列 float64 的整数倍: {path}")
+        mm = np.memmap(path, dtype=np.float64, mode=mode, shape=(rows, raw_columns))
+    if mm.dtype.kind != 'f':
+        raise ValueError(f"横轴必须是浮点类型，实际为 {mm.dtype}: {path}")
+    if mm.ndim not in (1, 2):
+        raise ValueError(f"仅支持一维或二维数组，实际为 {mm.ndim} 维: {path}")
+    return mm
+
+
+def _check_column(mm, column):
+    if mm.ndim == 2 and not 0 <= column < mm.shape[1]:
+        raise ValueError(f"--column {column} 超出范围 (共 {mm.shape[1]} 列)")
+
+
+def _axis_view(mm, column):
+    """一维数组即为横轴本身，二维数组取指定列"""
+    return mm if mm.ndim == 1 else mm[:, column]
+
+
+def convert_axis(mm, from_unit, to_unit, column=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """按块原位改写 memmap 中的横轴 (C / λ 与 1 / λ 关系)"""
+    axis = _axis_view(mm, column)
+    for start in range(0, len(axis), chunk_rows):
+        stop = start + chunk_rows
+        axis[start:stop] = convert_abs(axis[start:stop], from_unit, to_unit)
+    return axis
+
+
+def _copy_mapped(src, dst_path, raw_columns=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """按块把 src 复制到新的映射文件，返回新的 memmap"""
+    if raw_columns is None:
+        dst = np.lib.format.open_memmap(dst_path, mode='w+', dtype=src.dtype, shape=src.shape)
+    else:
+        dst = np.memmap(dst_path, dtype=src.dtype, mode='w+', shape=src.shape)
+    for start in range(0, len(src), chunk_rows):
+        dst[start:start + chunk_rows] = src[start:start + chunk_rows]
+    return dst
+
+
+def convert_file(path, from_unit, to_unit, output=None, column=0, raw_columns=None,
+                 chunk_rows=DEFAULT_CHUNK_ROWS):
+    """转换文件横轴；output 为 None 或与输入为同一文件时原位修改，否则写入新文件。返回处理的点数"""
+    unit_type(from_unit), unit_type(to_unit)
+    if output is not None and os.path.exists(output) and os.path.samefile(path, output):
+        # 以 w+ 打开输出会先截断输入
+        output = None
+    if output is None:
+        mm = open_axis_file(path, 'r+', raw_columns)
+        _check_column(mm, column)
+    else:
+        src = open_axis_file(path, 'r', raw_columns)
+        _check_column(src, column)
+        mm = _copy_mapped(src, output, raw_columns, chunk_rows)
+        del src
+    try:
+        axis = convert_axis(mm, from_unit, to_unit, column, chunk_rows)
+        mm.flush()
+        n = len(axis)
+        del axis, mm
+    except BaseException:
+        # 复制后转换失败: 不留下未转换的输出文件
+        if output is not None:
+            mm = None
+            os.remove(output)
+        raise
+    return n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="内存映射方式转换 .npy / 原始 float64 文件的光谱横轴")
+    parser.add_argument('path', help="输入文件 (.npy 或原始 float64)")
+    parser.add_argument('from_unit', help="横轴当前单位，如 nm")
+    parser.add_argument('to_unit', help="目标单位，如 THz 或 1/cm")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('-o', '--output', help="写入新的映射文件")
+    target.add_argument('--in-place', action='store_true', help="原位修改输入文件")
+    parser.add_argument('--column', type=int, default=0, help="二维数据中横轴所在列 (默认 0)")
+    parser.add_argument('--raw-columns', type=int, default=None,
+                        help="按原始 float64 读取，并指定每行列数 (一维轴为 1)")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="每块行数 (默认 %(default)s)")
+    args = parser.parse_args(argv)
+    if args.chunk_rows < 1:
+        parser.error("--chunk-rows 必须 >= 1")
+
+    try:
+        n = convert_file(args.path, args.from_unit, args.to_unit,
+                         output=None if args.in_place else args.output,
+                         column=args.column, raw_columns=args.raw_columns,
+                         chunk_rows=args.chunk_rows)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"错误: {e}\n")
+    print(f"已转换 {n} 个点: {args.from_unit} -> {args.to_unit}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
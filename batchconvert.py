@@ -0,0 +1,266 @@
+"""命令行批量转换 (无界面，不依赖 tkinter)
+
+按块读取 CSV / 空白分隔的文本列，转换指定列后逐块写出，内存占用与输入大小无关。
+
+示例:
+    python batchconvert.py spectrum.csv --abs 0 nm THz --delta 1 nm GHz --center-col 0 nm
+    cat log.txt | python batchconvert.py --power 2 dBm mW > out.txt
+
+空气波长 (--air-in / --air-out) 下 Δλ 也按空气宽度解释，与 GUI 的空气基准一致，例如
+    echo 0.9997280985 | python batchconvert.py --delta 0 nm GHz --center 1549.576562 nm --air-in
+输出 124.7835413 GHz (GUI 中真空 1550 nm / Δλ 1 nm 切换为空气基准后的显示值)。
+"""
+import argparse
+import sys
+from functools import partial
+from itertools import islice
+
+import numpy as np
+
+import airvacuum
+import dispersion
+from waveconvert import POWER_UNITS, convert_abs, convert_delta, convert_power, unit_type
+
+DEFAULT_CHUNK_ROWS = 65536
+
+
+def parse_column(fields, col):
+    """取出一列并转为 float 数组，无法解析的值记为 NaN"""
+    raw = [row[col] if col < len(row) else '' for row in fields]
+    try:
+        return np.array(raw, dtype=float)
+    except ValueError:
+        out = np.empty(len(raw))
+        for i, s in enumerate(raw):
+            try:
+                out[i] = float(s)
+            except ValueError:
+                out[i] = np.nan
+        return out
+
+
+def format_column(values):
+    """与 GUI 相同的显示精度 (.10g)"""
+    return [f"{v:.10g}" for v in values.tolist()]
+
+
+class Conversion:
+    """一列的转换规则: kind 为 'abs' / 'delta' / 'power'"""
+
+    def __init__(self, kind, col, from_unit, to_unit, center=None, medium=None, air=None):
+        self.kind = kind
+        self.col = col
+        self.from_unit = from_unit
+        self.to_unit = to_unit
+        self.center = center   # delta 用: (数值, 单位) 或 (列号, 单位, True)
+        self.medium = medium   # delta 用: 介质材料名，Δk 按其群折射率换算
+        self.air = air         # (air_in, air_out, env, method)，波长按空气波长解释
+
+    @property
+    def name(self):
+        prefix = 'd' if self.kind == 'delta' else ''
+        return f"{prefix}{self.to_unit}"
+
+    def apply(self, fields):
+        values = parse_column(fields, self.col)
+        if self.kind == 'abs':
+            if self.air is not None:
+                return airvacuum.convert_abs_air(values, self.from_unit, self.to_unit, *self.air)
+            return convert_abs(values, self.from_unit, self.to_unit)
+        if self.kind == 'power':
+            return convert_power(values, self.from_unit, self.to_unit)
+        center, center_unit, *is_col = self.center
+        if is_col:
+            center = parse_column(fields, center)
+        scale_in = scale_out = False
+        if self.air is not None:
+            air_in, air_out, env, method = self.air
+            if air_in:
+                center = airvacuum.convert_abs_air(center, center_unit, 'm', True, False, env, method)
+                center_unit = 'm'
+            # 空气中的 Δλ 与真空 Δλ 相差 dλ_air/dλ_vac (与 GUI 的空气基准一致)
+            scale_in = air_in and unit_type(self.from_unit) == 'wavelength'
+            scale_out = air_out and unit_type(self.to_unit) == 'wavelength'
+            if scale_in or scale_out:
+                factor = airvacuum.air_width_factor(convert_abs(center, center_unit, 'm'), env, method)
+                if scale_in:
+                    values = values / factor
+        group_index = 1.0
+        if self.medium is not None:
+            group_index = partial(dispersion.group_index, self.medium)
+        out = convert_delta(values, self.from_unit, self.to_unit, center, center_unit, group_index)
+        return out * factor if scale_out else out
+
+
+def split_line(line, delimiter):
+    """按分隔符拆分一行；delimiter 为 None 时按空白拆分"""
+    if delimiter is None:
+        return line.split()
+    return [s.strip() for s in line.rstrip('\r\n').split(delimiter)]
+
+
+def is_data(line):
+    """非空且不是 # 注释的行 (instrument 的实时解析也使用)"""
+    return line.strip() and not line.lstrip().startswith('#')
+
+
+def iter_chunks(stream, delimiter, chunk_rows):
+    """逐块读取，跳过空行与 # 注释行；每块返回字段列表"""
+    lines = filter(is_data, stream)
+    while True:
+        chunk = list(islice(lines, chunk_rows))
+        if not chunk:
+            return
+        yield [split_line(line, delimiter) for line in chunk]
+
+
+def convert_stream(src, dst, conversions, delimiter=None, header=False,
+                   replace=False, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """流式转换 src -> dst，返回处理的行数"""
+    first = next(filter(is_data, src), None)
+    if first is None:
+        return 0
+    if delimiter is None and ',' in first:
+        delimiter = ','
+    out_sep = delimiter if delimiter is not None else '\t'
+
+    pending = []
+    if header:
+        names = split_line(first, delimiter)
+        for conv in conversions:
+            if replace and conv.col < len(names):
+                names[conv.col] = conv.name
+            else:
+                names.append(conv.name)
+        dst.write(out_sep.join(names) + '\n')
+    else:
+        pending = [split_line(first, delimiter)]
+
+    total = 0
+    for fields in _with_first(pending, iter_chunks(src, delimiter, chunk_rows)):
+        results = [(conv, format_column(conv.apply(fields))) for conv in conversions]
+        for conv, column in results:
+            for row, value in zip(fields, column):
+                if replace and conv.col < len(row):
+                    row[conv.col] = value
+                else:
+                    row.append(value)
+        dst.write(''.join(out_sep.join(row) + '\n' for row in fields))
+        total += len(fields)
+    dst.flush()
+    return total
+
+
+def _with_first(first_rows, chunks):
+    """把已读取的首行并入第一块"""
+    for fields in chunks:
+        if first_rows:
+            fields = first_rows + fields
+            first_rows = None
+        yield fields
+    if first_rows:
+        yield first_rows
+
+
+def add_conversion_args(parser):
+    """文本列转换相关的命令行参数 (batchconvert 与 treeconvert 共用)"""
+    parser.add_argument('-d', '--delimiter', default=None,
+                        help="列分隔符，缺省自动识别 (逗号或空白)")
+    parser.add_argument('--header', action='store_true', help="首行为表头")
+    parser.add_argument('--replace', action='store_true', help="原位替换列，而不是追加新列")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="每块行数 (默认 %(default)s)")
+    parser.add_argument('--abs', nargs=3, action='append', default=[], metavar=('COL', 'FROM', 'TO'),
+                        help="绝对值转换，如 --abs 0 nm THz")
+    parser.add_argument('--delta', nargs=3, action='append', default=[], metavar=('COL', 'FROM', 'TO'),
+                        help="变化量转换，需配合 --center")
+    parser.add_argument('--center', nargs=2, metavar=('VALUE', 'UNIT'),
+                        help="Δ 转换的固定中心值及其单位，如 --center 1550 nm")
+    parser.add_argument('--center-col', nargs=2, metavar=('COL', 'UNIT'),
+                        help="Δ 转换的中心值取自某一列，如 --center-col 0 nm")
+    parser.add_argument('--medium', default=None,
+                        help="Δk 按介质群折射率换算，材料名见 sellmeier.csv (如 fused_silica)")
+    parser.add_argument('--air-in', action='store_true', help="输入的波长列为空气波长")
+    parser.add_argument('--air-out', action='store_true', help="输出的波长列为空气波长")
+    parser.add_argument('--air-env', nargs=4, type=float, default=list(airvacuum.STANDARD_AIR),
+                        metavar=('T_C', 'P_PA', 'RH', 'CO2_PPM'),
+                        help="空气环境: 温度 °C、气压 Pa、相对湿度 0~1、CO₂ ppm (默认 15 101325 0 450)")
+    parser.add_argument('--air-method', choices=airvacuum.METHODS, default='ciddor',
+                        help="空气折射率公式 (默认 %(default)s)")
+    parser.add_argument('--power', nargs=3, action='append', default=[], metavar=('COL', 'FROM', 'TO'),
+                        help=f"功率转换，单位为 {'/'.join(POWER_UNITS)}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="波长/频率/波数、Δ 与功率的批量列转换")
+    parser.add_argument('input', nargs='?', default='-', help="输入文件，缺省或 - 为 stdin")
+    parser.add_argument('-o', '--output', default='-', help="输出文件，缺省为 stdout")
+    add_conversion_args(parser)
+    return parser
+
+
+def parse_conversions(parser, args, required=True):
+    if args.chunk_rows < 1:
+        parser.error("--chunk-rows 必须 >= 1")
+    conversions = []
+    air = None
+    if args.air_in or args.air_out:
+        air = (args.air_in, args.air_out, tuple(args.air_env), args.air_method)
+    try:
+        for col, frm, to in args.abs:
+            unit_type(frm), unit_type(to)
+            conversions.append(Conversion('abs', int(col), frm, to, air=air))
+        if args.delta:
+            if args.center_col is not None:
+                center = (int(args.center_col[0]), args.center_col[1], True)
+            elif args.center is not None:
+                center = (float(args.center[0]), args.center[1])
+            else:
+                parser.error("--delta 需要 --center 或 --center-col")
+            unit_type(center[1])
+            if args.medium is not None and args.medium not in dispersion.materials():
+                raise ValueError(f"未知材料: {args.medium}")
+            for col, frm, to in args.delta:
+                unit_type(frm), unit_type(to)
+                conversions.append(Conversion('delta', int(col), frm, to, center, args.medium, air))
+        for col, frm, to in args.power:
+            if frm not in POWER_UNITS or to not in POWER_UNITS:
+                raise ValueError(f"功率单位须为 {'/'.join(POWER_UNITS)}")
+            conversions.append(Conversion('power', int(col), frm, to))
+    except ValueError as e:
+        parser.error(str(e))
+    if required and not conversions:
+        parser.error("至少需要一个 --abs / --delta / --power")
+    return conversions
+
+
+def parse_delimiter(delimiter):
+    """命令行中的 tab / \\t 表示制表符"""
+    if delimiter is not None and delimiter.lower() in ('tab', r'\t'):
+        return '\t'
+    return delimiter
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    conversions = parse_conversions(parser, args)
+    delimiter = parse_delimiter(args.delimiter)
+
+    src = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8', newline='')
+    dst = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        convert_stream(src, dst, conversions, delimiter=delimiter, header=args.header,
+                       replace=args.replace, chunk_rows=args.chunk_rows)
+    except BrokenPipeError:
+        pass
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
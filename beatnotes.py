@@ -0,0 +1,133 @@
+"""激光器频率规划: 两两拍频矩阵与近碰撞搜索
+
+给定任意 UNIT_FACTORS 绝对单位的激光器列表，计算两两频率差 |f_i − f_j|，
+找出拍频落在指定射频带 [lo, hi] 内的全部组合。
+    dense  分块广播 (block × block)，内存占用与 n 无关，适合需要完整矩阵的中小规模
+    sweep  排序后对每个激光器二分查找 [f + lo, f + hi] 区间，复杂度 O(n log n + 结果数)
+
+示例:
+    python beatnotes.py lasers.txt nm 0 20 GHz
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from waveconvert import convert_abs, to_si, unit_type
+
+DEFAULT_BLOCK = 2048
+
+
+def to_frequency(values, unit):
+    """任意绝对单位 -> 频率 (Hz)"""
+    return convert_abs(values, unit, 'Hz')
+
+
+def iter_beat_blocks(freqs, block=DEFAULT_BLOCK):
+    """分块产出拍频矩阵的上三角块 (i0, j0, |f_i − f_j|)，每块最多 block × block"""
+    f = np.asarray(freqs, dtype=float)
+    n = len(f)
+    for i0 in range(0, n, block):
+        fi = f[i0:i0 + block, None]
+        for j0 in range(i0, n, block):
+            yield i0, j0, np.abs(fi - f[None, j0:j0 + block])
+
+
+def beat_matrix(freqs, block=DEFAULT_BLOCK):
+    """完整的 n × n 拍频矩阵 (仅用于小规模)"""
+    f = np.asarray(freqs, dtype=float)
+    out = np.empty((len(f), len(f)))
+    for i0, j0, b in iter_beat_blocks(f, block):
+        out[i0:i0 + b.shape[0], j0:j0 + b.shape[1]] = b
+        out[j0:j0 + b.shape[1], i0:i0 + b.shape[0]] = b.T
+    return out
+
+
+def find_pairs_dense(freqs, lo, hi, block=DEFAULT_BLOCK):
+    """分块广播搜索拍频 ∈ [lo, hi] 的组合，返回 (i, j, 拍频 Hz)，i < j"""
+    ii, jj, bb = [], [], []
+    for i0, j0, b in iter_beat_blocks(freqs, block):
+        mask = (b >= lo) & (b <= hi)
+        if i0 == j0:
+            mask &= np.triu(np.ones(b.shape, dtype=bool), k=1)
+        r, c = np.nonzero(mask)
+        ii.append(r + i0)
+        jj.append(c + j0)
+        bb.append(b[r, c])
+    if not ii:
+        return np.empty(0, int), np.empty(0, int), np.empty(0)
+    return np.concatenate(ii), np.concatenate(jj), np.concatenate(bb)
+
+
+def find_pairs_sweep(freqs, lo, hi):
+    """排序 + 二分查找搜索拍频 ∈ [lo, hi] 的组合，返回 (i, j, 拍频 Hz)，i < j 为原始下标"""
+    f = np.asarray(freqs, dtype=float)
+    order = np.argsort(f, kind='stable')
+    fs = f[order]
+    n = len(fs)
+    # 对排序后的第 k 个激光器，伙伴为 fs 中 [fs[k] + lo, fs[k] + hi] 区间内且下标 > k 的元素
+    start = np.maximum(np.searchsorted(fs, fs + lo, side='left'), np.arange(1, n + 1))
+    stop = np.searchsorted(fs, fs + hi, side='right')
+    counts = np.maximum(stop - start, 0)
+    total = int(counts.sum())
+    a = np.repeat(np.arange(n), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    b = np.repeat(start, counts) + offsets
+    beat = fs[b] - fs[a]
+    i, j = order[a], order[b]
+    swap = i > j
+    i[swap], j[swap] = j[swap], i[swap]
+    return i, j, beat
+
+
+def find_pairs(values, unit, band, band_unit='Hz', method='auto', block=DEFAULT_BLOCK):
+    """拍频落在 band = (lo, hi) 内的全部激光器组合
+
+    method='auto' 时 n 较小用 dense，否则用 sweep。返回 (i, j, 拍频，单位 band_unit)。
+    """
+    if unit_type(band_unit) != 'frequency':
+        raise ValueError(f"射频带单位必须是频率单位: {band_unit}")
+    f = to_frequency(values, unit)
+    lo, hi = to_si(np.asarray(band, dtype=float), band_unit)
+    if method == 'auto':
+        method = 'dense' if len(f) <= block else 'sweep'
+    if method == 'dense':
+        i, j, beat = find_pairs_dense(f, lo, hi, block)
+    elif method == 'sweep':
+        i, j, beat = find_pairs_sweep(f, lo, hi)
+    else:
+        raise ValueError(f"未知方法: {method}")
+    order = np.lexsort((j, i))
+    return i[order], j[order], beat[order] / to_si(1.0, band_unit)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="激光器拍频近碰撞搜索")
+    parser.add_argument('path', help="激光器列表文件 (每行一个值，取第一列)，- 为 stdin")
+    parser.add_argument('unit', help="列表中的单位，如 nm 或 THz")
+    parser.add_argument('lo', type=float, help="射频带下限")
+    parser.add_argument('hi', type=float, help="射频带上限")
+    parser.add_argument('band_unit', help="射频带单位，如 GHz 或 MHz")
+    parser.add_argument('--method', choices=('auto', 'dense', 'sweep'), default='auto')
+    parser.add_argument('--block', type=int, default=DEFAULT_BLOCK, help="dense 分块大小")
+    args = parser.parse_args(argv)
+
+    try:
+        unit_type(args.unit)
+        src = sys.stdin if args.path == '-' else args.path
+        values = np.loadtxt(src, usecols=0, delimiter=None, comments='#', ndmin=1)
+        i, j, beat = find_pairs(values, args.unit, (args.lo, args.hi), args.band_unit,
+                                args.method, args.block)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"错误: {e}\n")
+    out = sys.stdout
+    out.write(f"i,j,{args.unit}_i,{args.unit}_j,beat_{args.band_unit}\n")
+    for a, b, x in zip(i.tolist(), j.tolist(), beat.tolist()):
+        out.write(f"{a},{b},{values[a]:.10g},{values[b]:.10g},{x:.10g}\n")
+    print(f"{len(values)} 个激光器，{len(i)} 对拍频落在 [{args.lo:g}, {args.hi:g}] {args.band_unit}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""GUI 联动计算的依赖图: 脏标记传播 + 解析结果缓存 + 仅在变化时写回
+
+节点按添加顺序即为拓扑序 (依赖节点必须先添加)。
+    Group    一组可互相换算的输入框 (如 f/λ/k)，记住最后编辑的源字段，由 solve 计算其余字段
+    Derived  由上游节点的值计算出的派生量 (如 n_g、光子能量)，可带 sink 回调 (如设置标签文本)
+    Choice   下拉框等原样取值的输入
+Debouncer 把连续按键合并为一次计算 (实时模式)。
+某个节点重算后值未改变时不再向下游传播，无关的面板不会被重算。
+不依赖 tkinter：var 只需提供 get() / set()，便于在无界面环境下使用。
+"""
+from waveconvert import from_si, to_si
+
+DEBOUNCE_MS = 150       # 实时模式: 最后一次按键后等待多久再计算
+
+
+class Field:
+    """一个输入框: 文本 (+ 单位) <-> SI 值，缓存上次的解析结果
+
+    unit 为单位名，或提供 get() 的对象 (如单位下拉框的 StringVar)。
+    to_si(value, unit) / from_si(si, unit) 默认为 waveconvert 的线性单位换算。
+    """
+
+    def __init__(self, var, unit, to_si=to_si, from_si=from_si, fmt='{:.10g}'):
+        self.var = var
+        self.unit = unit
+        self.fmt = fmt
+        self._to_si = to_si
+        self._from_si = from_si
+        self._key = None
+        self._si = None
+
+    def _unit(self):
+        return self.unit.get() if hasattr(self.unit, 'get') else self.unit
+
+    def read(self):
+        """当前文本对应的 SI 值；文本与单位未变时直接返回缓存，无法解析时为 None"""
+        key = (self.var.get(), self._unit())
+        if key != self._key:
+            try:
+                si = float(self._to_si(float(key[0]), key[1]))
+            except (ValueError, OverflowError):
+                si = None
+            self._key, self._si = key, si
+        return self._si
+
+    def write(self, si):
+        """按当前单位格式化写回；文本与现有内容相同时不调用 var.set"""
+        unit = self._unit()
+        text = "" if si is None else self.fmt.format(float(self._from_si(si, unit)))
+        if self.var.get() != text:
+            self.var.set(text)
+        self._key, self._si = (text, unit), si
+
+    def changed(self):
+        """文本或单位与上次解析/写回时不同 (用于过滤不改变内容的按键，如 Tab、方向键)"""
+        return (self.var.get(), self._unit()) != self._key
+
+    def invalidate(self):
+        """解析方式本身改变时 (如波长基准切换) 丢弃缓存"""
+        self._key = None
+
+
+class Node:
+    def __init__(self, name, depends=(), sink=None):
+        self.name = name
+        self.depends = tuple(depends)
+        self.sink = sink
+        self.value = None
+
+    def compute(self, *inputs):
+        raise NotImplementedError
+
+
+class Group(Node):
+    """互相换算的一组字段
+
+    solve(source, source_si, *inputs) 返回 {tag: SI 值}，无法计算时返回 None (保持原值，
+    不向下游传播)。非源字段按结果写回，源字段保持用户输入不动。
+    """
+
+    def __init__(self, name, fields, solve, depends=(), source=None, sink=None):
+        super().__init__(name, depends, sink)
+        self.fields = fields
+        self.solve = solve
+        self.source = source
+
+    def compute(self, *inputs):
+        src = self.source
+        si = self.fields[src].read() if src in self.fields else None
+        result = self.solve(src, si, *inputs)
+        if result is None:
+            return self.value
+        for tag, value in result.items():
+            if tag != src:
+                self.fields[tag].write(value)
+        return result
+
+
+class Derived(Node):
+    """派生量: value = fn(*上游节点的值)"""
+
+    def __init__(self, name, fn, depends=(), sink=None):
+        super().__init__(name, depends, sink)
+        self.fn = fn
+
+    def compute(self, *inputs):
+        return self.fn(*inputs)
+
+
+class Choice(Node):
+    """原样取值的输入 (如介质、基准下拉框)"""
+
+    def __init__(self, name, var, sink=None):
+        super().__init__(name, (), sink)
+        self.var = var
+
+    def compute(self):
+        return self.var.get()
+
+
+class Graph:
+    def __init__(self):
+        self.nodes = {}
+        self._dependents = {}
+        self._dirty = set()
+
+    def add(self, node):
+        """添加节点 (其依赖必须已添加)；新节点标记为脏，下次 recompute 时计算"""
+        for dep in node.depends:
+            if dep not in self.nodes:
+                raise KeyError(f"依赖节点尚未添加: {dep}")
+            self._dependents[dep].append(node.name)
+        self.nodes[node.name] = node
+        self._dependents[node.name] = []
+        self._dirty.add(node.name)
+        return node
+
+    def __getitem__(self, name):
+        return self.nodes[name]
+
+    def value(self, name):
+        return self.nodes[name].value
+
+    def mark(self, name):
+        self._dirty.add(name)
+
+    def edit(self, name, source=None):
+        """用户编辑了节点 name (Group 时 source 为被编辑的字段)，并重算受影响的节点"""
+        node = self.nodes[name]
+        if source is not None:
+            node.source = source
+        self.mark(name)
+        self.recompute()
+
+    def recompute(self):
+        """按拓扑序重算脏节点；值改变的节点把下游标记为脏并调用 sink"""
+        for name, node in self.nodes.items():
+            if name not in self._dirty:
+                continue
+            self._dirty.discard(name)
+            new = node.compute(*(self.nodes[d].value for d in node.depends))
+            if new != node.value:
+                node.value = new
+                self._dirty.update(self._dependents[name])
+                if node.sink:
+                    node.sink(new)
+
+
+class Debouncer:
+    """按 key 合并连续触发: 每次 schedule 取消该 key 尚未执行的上一次，只执行最后一次
+
+    widget 只需提供 Tk 的 after() / after_cancel()。
+    """
+
+    def __init__(self, widget, delay_ms=DEBOUNCE_MS):
+        self.widget = widget
+        self.delay_ms = delay_ms
+        self._pending = {}
+
+    def schedule(self, key, fn, *args):
+        self.cancel(key)
+        self._pending[key] = self.widget.after(self.delay_ms, self._run, key, fn, args)
+
+    def cancel(self, key):
+        job = self._pending.pop(key, None)
+        if job is not None:
+            self.widget.after_cancel(job)
+
+    def _run(self, key, fn, args):
+        self._pending.pop(key, None)
+        fn(*args)
@@ -0,0 +1,155 @@
+"""光学谐振腔: 腔长 / 自由光谱范围 (FSR) / 精细度 / 模式线宽 换算与纵模梳
+
+    FSR = c / (n_g·L_rt)，L_rt 为往返光程长度 (线形腔 2L，环形腔 L)
+    F   = π·(R1·R2)^¼ / (1 − √(R1·R2))
+    δν  = FSR / F
+纵模 f_q = q·FSR + f_offset (f_offset 包含 Gouy 相移等引起的整体偏移)。
+模式梳是等差数列，最近模式直接由 round((f − f_offset) / FSR) 求得，
+百万量级的梳可按块惰性生成，不必整体驻留内存。
+
+示例:
+    python cavity.py 0.1 m --reflectivity 0.999 --center 1550 nm
+    python cavity.py 0.1 m --lasers lasers.txt nm
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from waveconvert import C, convert_abs, convert_delta, to_si, unit_type
+
+GEOMETRIES = {'linear': 2.0, 'ring': 1.0}     # 往返光程 / 腔长
+DEFAULT_CHUNK = 1 << 20
+
+
+def fsr_from_length(length, group_index=1.0, geometry='linear'):
+    """腔长 (m) -> FSR (Hz)"""
+    return C / (group_index * GEOMETRIES[geometry] * np.asarray(length, dtype=float))
+
+
+def length_from_fsr(fsr, group_index=1.0, geometry='linear'):
+    """FSR (Hz) -> 腔长 (m)"""
+    return C / (group_index * GEOMETRIES[geometry] * np.asarray(fsr, dtype=float))
+
+
+def finesse_from_reflectivity(r1, r2=None):
+    """两镜强度反射率 -> 精细度 (r2 省略时两镜相同)"""
+    r = np.asarray(r1, dtype=float) * np.asarray(r1 if r2 is None else r2, dtype=float)
+    return np.pi * r ** 0.25 / (1 - np.sqrt(r))
+
+
+def linewidth(fsr, finesse):
+    """模式线宽 (FWHM, Hz)"""
+    return np.asarray(fsr, dtype=float) / np.asarray(finesse, dtype=float)
+
+
+def finesse_from_linewidth(fsr, width):
+    return np.asarray(fsr, dtype=float) / np.asarray(width, dtype=float)
+
+
+def fsr_as(fsr, unit, center, center_unit='nm'):
+    """FSR (Hz) 换算为中心波长处的 Δλ / Δk 等 Δ 单位 (同 _calc_delta)"""
+    return np.abs(convert_delta(fsr, 'Hz', unit, center, center_unit))
+
+
+class Cavity:
+    """一个谐振腔的纵模梳: FSR、精细度与整体频率偏移 (Hz)"""
+
+    def __init__(self, fsr, finesse=np.inf, offset=0.0):
+        self.fsr = float(fsr)
+        self.finesse = float(finesse)
+        self.offset = float(offset)
+
+    @classmethod
+    def from_length(cls, length, unit='m', group_index=1.0, geometry='linear',
+                    reflectivity=None, finesse=np.inf, offset=0.0):
+        """由腔长构造；给出 reflectivity (R 或 (R1, R2)) 时按其计算精细度"""
+        fsr = fsr_from_length(to_si(length, unit), group_index, geometry)
+        if reflectivity is not None:
+            finesse = finesse_from_reflectivity(*np.atleast_1d(reflectivity))
+        return cls(fsr, finesse, offset)
+
+    @property
+    def linewidth(self):
+        return linewidth(self.fsr, self.finesse)
+
+    def mode_frequency(self, q):
+        return np.asarray(q) * self.fsr + self.offset
+
+    def mode_range(self, start, stop, unit='Hz'):
+        """[start, stop] (任意绝对单位) 内的纵模序号范围 (q_min, q_max + 1)"""
+        lo, hi = sorted(float(v) for v in convert_abs(np.asarray([start, stop], dtype=float), unit, 'Hz'))
+        return int(np.ceil((lo - self.offset) / self.fsr)), int(np.floor((hi - self.offset) / self.fsr)) + 1
+
+    def iter_comb(self, start, stop, unit='Hz', chunk=DEFAULT_CHUNK):
+        """惰性生成区间内的纵模，逐块产出 (q, 频率 Hz)"""
+        q0, q1 = self.mode_range(start, stop, unit)
+        for a in range(q0, q1, chunk):
+            q = np.arange(a, min(a + chunk, q1), dtype=np.int64)
+            yield q, self.mode_frequency(q)
+
+    def comb(self, start, stop, unit='Hz'):
+        """区间内全部纵模 (q, 频率 Hz)"""
+        q = np.arange(*self.mode_range(start, stop, unit), dtype=np.int64)
+        return q, self.mode_frequency(q)
+
+    def nearest_mode(self, values, unit='Hz'):
+        """批量最近纵模: 返回 (q, 模式频率 Hz, 失谐 Hz, 失谐 / 线宽)；精细度未知时最后一项为 NaN"""
+        f = convert_abs(values, unit, 'Hz')
+        q = np.rint((f - self.offset) / self.fsr).astype(np.int64)
+        f_mode = self.mode_frequency(q)
+        detuning = f - f_mode
+        if np.isfinite(self.finesse):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                det_lw = detuning / self.linewidth
+        else:
+            det_lw = np.full(np.shape(detuning), np.nan) if np.ndim(detuning) else float('nan')
+        return q, f_mode, detuning, det_lw
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="谐振腔 FSR / 精细度 / 线宽 与最近纵模查询")
+    parser.add_argument('length', type=float, help="腔长")
+    parser.add_argument('unit', help="腔长单位，如 m 或 mm")
+    parser.add_argument('--ring', action='store_true', help="环形腔 (默认线形腔)")
+    parser.add_argument('--group-index', type=float, default=1.0, help="腔内群折射率，默认 1")
+    parser.add_argument('--reflectivity', type=float, nargs='+', metavar='R', help="镜面反射率 R 或 R1 R2")
+    parser.add_argument('--finesse', type=float, help="直接给定精细度")
+    parser.add_argument('--offset', type=float, default=0.0, help="纵模整体频率偏移 (Hz)")
+    parser.add_argument('--center', nargs=2, metavar=('VALUE', 'UNIT'), default=('1550', 'nm'),
+                        help="换算 FSR 波长宽度的中心波长，默认 1550 nm")
+    parser.add_argument('--lasers', nargs=2, metavar=('PATH', 'UNIT'), help="激光器列表文件，输出最近纵模")
+    args = parser.parse_args(argv)
+
+    try:
+        unit_type(args.unit)
+        if args.reflectivity and len(args.reflectivity) > 2:
+            raise ValueError("--reflectivity 只接受 1 或 2 个值")
+        cav = Cavity.from_length(args.length, args.unit, args.group_index,
+                                 'ring' if args.ring else 'linear', args.reflectivity,
+                                 args.finesse or np.inf, args.offset)
+        center = (float(args.center[0]), args.center[1])
+        print(f"FSR = {cav.fsr / 1e6:.6g} MHz = {float(fsr_as(cav.fsr, 'pm', *center)):.6g} pm "
+              f"@ {center[0]:g} {center[1]}")
+        if np.isfinite(cav.finesse):
+            print(f"精细度 = {cav.finesse:.6g}   线宽 = {cav.linewidth / 1e3:.6g} kHz")
+        if args.lasers:
+            path, unit = args.lasers
+            values = np.loadtxt(sys.stdin if path == '-' else path, usecols=0, comments='#', ndmin=1)
+            q, f_mode, det, det_lw = cav.nearest_mode(values, unit)
+            columns = [values, q, f_mode / 1e12, det / 1e6]
+            header, fmt = f"{unit},q,mode_THz,detuning_MHz", "{:.10g},{},{:.10g},{:.6g}"
+            if np.isfinite(cav.finesse):
+                # 未给出精细度时线宽未知，不输出该列
+                columns.append(det_lw)
+                header, fmt = header + ",detuning_linewidths", fmt + ",{:.4g}"
+            print(header)
+            for row in zip(*(c.tolist() for c in columns)):
+                print(fmt.format(*row))
+    except (OSError, ValueError, KeyError) as e:
+        parser.exit(1, f"错误: {e}\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
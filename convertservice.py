@@ -0,0 +1,276 @@
+"""本地换算服务: asyncio HTTP/1.1 + JSON (保持连接，多客户端并发)
+
+供其它实验室工具调用，避免各自重新实现 Wavelength.py / fibercoupling.py 中的公式。
+全部计算复用 waveconvert / coupling / fibermodel 的向量化函数；values 为单个数值时返回数值，
+为数组时返回数组 (单个请求即可批量换算)。非有限结果 (如 λ = 0) 以 null 表示。
+
+    POST /abs       {"values": 1550, "from": "nm", "to": "THz"}
+    POST /delta     {"values": [1, 2], "from": "nm", "to": "GHz", "center": 1550, "center_unit": "nm"}
+    POST /power     {"values": 0, "from": "dBm", "to": "mW"}
+    POST /coupling  {"wavelength": 1550, "diameter": 2, "mfd": "SMF-28"}
+                    (默认单位 nm / mm / µm；可选 focal、lateral、tilt、defocus，SI 单位 m / rad)
+    POST /batch     {"requests": [{"op": "abs", ...}, {"op": "power", ...}]}
+    GET  /health
+
+大批量请求 (请求体超过 OFFLOAD_BYTES) 在线程池中计算，不阻塞其它连接。
+dispatch() / handle_request() 不依赖网络，可直接调用测试；也可监听 Unix 域套接字。
+
+示例:
+    python convertservice.py --port 8765
+    curl -d '{"values": 1550, "from": "nm", "to": "THz"}' http://127.0.0.1:8765/abs
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+import numpy as np
+
+from coupling import COUPLING_OPTIONS, coupling_efficiency, focal_length
+from fibermodel import fiber_mfd, find_fiber
+from waveconvert import convert_abs, convert_delta, convert_power, to_si
+
+DEFAULT_PORT = 8765
+OFFLOAD_BYTES = 256 << 10      # 请求体超过此大小 (约 2 万个数值) 时放到线程池计算
+MAX_BODY = 64 << 20
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large',
+               431: 'Request Header Fields Too Large', 500: 'Internal Server Error'}
+
+
+class RequestError(ValueError):
+    """请求内容无效 (默认返回 400)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _values(payload, key='values'):
+    try:
+        values = np.asarray(payload[key], dtype=float)
+    except KeyError:
+        raise RequestError(f"缺少字段: {key}") from None
+    except (TypeError, ValueError):
+        raise RequestError(f"字段 {key} 必须是数值或数值数组") from None
+    if not np.all(np.isfinite(values)):
+        # 如 1e400 被 JSON 解析为 inf
+        raise RequestError(f"字段 {key} 含非有限值 (inf / nan)")
+    return values
+
+
+def _field(payload, key, default=None):
+    value = payload.get(key, default)
+    if value is None:
+        raise RequestError(f"缺少字段: {key}")
+    return value
+
+
+def _jsonable(x):
+    """numpy 结果 -> JSON：标量保持标量，非有限值为 null"""
+    x = np.asarray(x, dtype=float)
+    out = np.where(np.isfinite(x), x, None)
+    return out.tolist() if out.ndim else out.item()
+
+
+def op_abs(p):
+    return {'values': _jsonable(convert_abs(_values(p), _field(p, 'from'), _field(p, 'to')))}
+
+
+def op_delta(p):
+    out = convert_delta(_values(p), _field(p, 'from'), _field(p, 'to'), _values(p, 'center'),
+                        p.get('center_unit', 'nm'))
+    return {'values': _jsonable(out)}
+
+
+def op_power(p):
+    return {'values': _jsonable(convert_power(_values(p), _field(p, 'from'), _field(p, 'to')))}
+
+
+def op_coupling(p):
+    """最佳焦距 (mm)；给出 focal/lateral/tilt/defocus 任一项时同时返回耦合效率"""
+    wavelength = to_si(_values(p, 'wavelength'), p.get('wavelength_unit', 'nm'))
+    diameter = to_si(_values(p, 'diameter'), p.get('diameter_unit', 'mm'))
+    mfd_in = _field(p, 'mfd')
+    if isinstance(mfd_in, str):
+        # 光纤型号: 按波长查表
+        try:
+            mfd = fiber_mfd(find_fiber(mfd_in), wavelength)
+        except KeyError as e:
+            raise RequestError(e.args[0]) from None
+    else:
+        mfd = to_si(_values(p, 'mfd'), p.get('mfd_unit', 'µm'))
+    result = {'focal_mm': _jsonable(focal_length(wavelength, diameter, mfd) * 1e3),
+              'mfd_um': _jsonable(mfd * 1e6)}
+    opts = {k: _values(p, k) for k, *_ in COUPLING_OPTIONS if p.get(k) is not None}
+    if opts:
+        result['efficiency'] = _jsonable(coupling_efficiency(wavelength, diameter, mfd, **opts))
+    return result
+
+
+def op_batch(p):
+    requests = _field(p, 'requests')
+    if not isinstance(requests, list):
+        raise RequestError("requests 必须是数组")
+    results = []
+    for item in requests:
+        op = item.get('op') if isinstance(item, dict) else item
+        if not isinstance(item, dict) or not isinstance(op, str) or op not in OPERATIONS or op == 'batch':
+            results.append({'error': f"未知操作: {op}"})
+            continue
+        try:
+            results.append(OPERATIONS[item['op']](item))
+        except (ValueError, KeyError, TypeError) as e:
+            results.append({'error': str(e)})
+    return {'results': results}
+
+
+OPERATIONS = {'abs': op_abs, 'delta': op_delta, 'power': op_power, 'coupling': op_coupling, 'batch': op_batch}
+
+
+def dispatch(op, payload):
+    """执行一个操作，返回可序列化为 JSON 的结果；请求无效时抛出 RequestError"""
+    if not isinstance(payload, dict):
+        raise RequestError("请求体必须是 JSON 对象")
+    try:
+        return OPERATIONS[op](payload)
+    except RequestError:
+        raise
+    except (ValueError, KeyError, TypeError) as e:
+        # 单位名错误等 (unit_type 抛出 ValueError)
+        raise RequestError(str(e)) from None
+
+
+def handle_request(method, path, body):
+    """处理一个 HTTP 请求 (不涉及网络): 返回 (状态码, JSON 对象)"""
+    path = path.split('?', 1)[0].rstrip('/') or '/'
+    if path == '/health':
+        return 200, {'status': 'ok', 'operations': sorted(OPERATIONS)}
+    op = path.lstrip('/')
+    if op not in OPERATIONS:
+        return 404, {'error': f"未知路径: {path}"}
+    if method != 'POST':
+        return 405, {'error': "仅支持 POST"}
+    try:
+        payload = json.loads(body or b'{}')
+    except ValueError as e:
+        # JSONDecodeError 与非 UTF-8 请求体的 UnicodeDecodeError 均为 ValueError
+        return 400, {'error': f"JSON 解析失败: {e}"}
+    try:
+        return 200, dispatch(op, payload)
+    except RequestError as e:
+        return 400, {'error': str(e)}
+
+
+def _response(status, obj, keep_alive):
+    body = json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode()
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+async def _readline(reader):
+    """读取一行；超过流的行长度上限时按 431 处理"""
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise RequestError("请求行或头部过长", 431) from None
+
+
+async def _read_request(reader):
+    """读取一个请求: 返回 (method, path, version, headers, body)，连接关闭时返回 None"""
+    line = await _readline(reader)
+    if not line:
+        return None
+    try:
+        method, path, version = line.decode('latin-1').split()
+    except ValueError:
+        raise RequestError("无效的请求行") from None
+    headers = {}
+    while True:
+        line = await _readline(reader)
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0) or 0)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise RequestError("无效的 Content-Length")
+    if length > MAX_BODY:
+        raise RequestError("请求体过大", 413)
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), path, version, headers, body
+
+
+async def handle_connection(reader, writer):
+    """一个客户端连接: 按 HTTP/1.1 默认保持连接，依次处理请求"""
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except RequestError as e:
+                writer.write(_response(e.status, {'error': str(e)}, False))
+                break
+            if request is None:
+                break
+            method, path, version, headers, body = request
+            conn = headers.get('connection', '').lower()
+            keep_alive = conn != 'close' and (version == 'HTTP/1.1' or conn == 'keep-alive')
+            try:
+                if len(body) > OFFLOAD_BYTES:
+                    # 大批量: 放到默认线程池中计算 (numpy 计算期间释放 GIL)，不阻塞其它连接
+                    status, obj = await loop.run_in_executor(None, handle_request, method, path, body)
+                else:
+                    status, obj = handle_request(method, path, body)
+            except Exception as e:
+                # 计算中的意外错误: 仍然回复客户端，而不是直接断开连接
+                status, obj = 500, {'error': f"{type(e).__name__}: {e}"}
+            writer.write(_response(status, obj, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host='127.0.0.1', port=DEFAULT_PORT, unix=None):
+    """启动服务 (unix 给出路径时监听 Unix 域套接字)，返回 asyncio Server"""
+    if unix:
+        return await asyncio.start_unix_server(handle_connection, path=unix)
+    return await asyncio.start_server(handle_connection, host, port)
+
+
+async def _main_async(args):
+    server = await serve(args.host, args.port, args.unix)
+    where = args.unix or f"http://{args.host}:{args.port}"
+    print(f"换算服务已启动: {where}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地换算服务 (HTTP/JSON)")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址，默认 %(default)s")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="端口，默认 %(default)s")
+    parser.add_argument('--unix', help="改为监听 Unix 域套接字路径")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_main_async(args))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        parser.exit(1, f"错误: {e}\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""光纤耦合焦距计算 (向量化)
+
+f = π × D × MFD / (4 × λ)，全部使用 SI 单位 (m)。
+"""
+import numpy as np
+
+from fibermodel import fiber_mfd, find_fiber
+
+COUPLING_VARS = ('focal', 'wavelength', 'diameter', 'mfd')
+
+# 可选的实际透镜/对准参数 (coupling_efficiency 的关键字): (关键字, 标签, 单位, 换算到 SI 的系数)
+COUPLING_OPTIONS = [
+    ('focal', '实际焦距', 'mm', 1e-3),
+    ('lateral', '横向偏移', 'μm', 1e-6),
+    ('tilt', '倾角', 'mrad', 1e-3),
+    ('defocus', '离焦', 'μm', 1e-6),
+]
+
+
+def focal_length(wavelength, diameter, mfd):
+    """最佳耦合焦距 f = πD·MFD/(4λ)，参数可为任意可广播数组"""
+    wavelength = np.asarray(wavelength, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (np.pi * np.asarray(diameter, dtype=float) * np.asarray(mfd, dtype=float)) / (4 * wavelength)
+
+
+def sweep(wavelengths, diameters, mfds):
+    """在 λ × D × MFD 的笛卡尔网格上计算焦距，返回形状 (nλ, nD, nMFD) 的数组"""
+    l = np.asarray(wavelengths, dtype=float).reshape(-1, 1, 1)
+    d = np.asarray(diameters, dtype=float).reshape(1, -1, 1)
+    m = np.asarray(mfds, dtype=float).reshape(1, 1, -1)
+    return focal_length(l, d, m)
+
+
+def solve(focal=None, wavelength=None, diameter=None, mfd=None):
+    """已知其中三个量，求剩下的一个 (逐元素广播)
+
+    例如固定透镜求所需光斑直径: solve(focal=f, wavelength=λ, mfd=MFD)
+    """
+    given = {'focal': focal, 'wavelength': wavelength, 'diameter': diameter, 'mfd': mfd}
+    missing = [k for k, v in given.items() if v is None]
+    if len(missing) != 1:
+        raise ValueError(f"必须且只能留空一个变量，当前留空: {missing}")
+    v = {k: np.asarray(x, dtype=float) for k, x in given.items() if x is not None}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if missing[0] == 'focal':
+            return focal_length(v['wavelength'], v['diameter'], v['mfd'])
+        if missing[0] == 'wavelength':
+            return np.pi * v['diameter'] * v['mfd'] / (4 * v['focal'])
+        if missing[0] == 'diameter':
+            return 4 * v['wavelength'] * v['focal'] / (np.pi * v['mfd'])
+        return 4 * v['wavelength'] * v['focal'] / (np.pi * v['diameter'])
+
+
+def _overlap_1d(a1, a2, offset, tilt, k):
+    """一维高斯场重叠效率；a = ik/(2q)，场为 exp(-a(x-offset)² + ik·tilt·x)"""
+    A = a1 + np.conj(a2)
+    B = 2 * a1 * offset + 1j * k * tilt
+    expo = B ** 2 / (4 * A) - a1 * offset ** 2
+    return 2 * np.sqrt(a1.real * a2.real) / np.abs(A) * np.exp(2 * expo.real)
+
+
+def coupling_efficiency(wavelength, diameter, mfd, focal=None, lateral=0.0, tilt=0.0, defocus=0.0):
+    """实际透镜的高斯模式重叠耦合效率 (0~1)，全部参数可广播
+
+    wavelength, diameter (入射 1/e² 直径), mfd, focal (实际焦距，缺省为理想焦距) 单位 m；
+    lateral 为光斑与纤芯的横向偏移 (m)，tilt 为光束与光纤轴的夹角 (rad)，
+    defocus 为光纤端面偏离焦点的距离 (m)。
+    """
+    wavelength = np.asarray(wavelength, dtype=float)
+    diameter = np.asarray(diameter, dtype=float)
+    mfd = np.asarray(mfd, dtype=float)
+    if focal is None:
+        focal = focal_length(wavelength, diameter, mfd)
+    focal = np.asarray(focal, dtype=float)
+    k = 2 * np.pi / wavelength
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # 透镜焦点处的束腰 w1 = 2λf/(πD)，与 f = πD·MFD/(4λ) 一致
+        w1 = 2 * wavelength * focal / (np.pi * diameter)
+        w2 = mfd / 2
+        q1 = np.asarray(defocus, dtype=float) + 1j * np.pi * w1 ** 2 / wavelength
+        a1 = 1j * k / (2 * q1)
+        a2 = (1 / w2 ** 2).astype(complex)
+        eta = _overlap_1d(a1, a2, np.asarray(lateral, dtype=float), np.asarray(tilt, dtype=float), k) \
+            * _overlap_1d(a1, a2, 0.0, 0.0, k)
+    return np.nan_to_num(eta, nan=0.0)
+
+
+def resolve_mfd(mfd, wavelength):
+    """MFD 输入: 数值按 μm，否则按光纤型号在 wavelength (m) 处查表；返回 (MFD m, 光纤名或 None)"""
+    text = str(mfd).strip()
+    try:
+        return float(text) * 1e-6, None
+    except ValueError:
+        pass
+    try:
+        fiber = find_fiber(text)
+    except KeyError:
+        raise ValueError(f"未知光纤类型 {text}") from None
+    return float(fiber_mfd(fiber, wavelength)), fiber
+
+
+def coupling_from_inputs(wavelength_nm, diameter_mm, mfd, options=None):
+    """两个 GUI 共用的输入解析与计算 (文本或数值均可)
+
+    mfd 为 μm 数值或光纤型号；options 为 {关键字: COUPLING_OPTIONS 单位下的数值}，空值忽略。
+    返回 (理想焦距 m, 结果文本)；输入无效时抛出 ValueError，消息可直接显示。
+    """
+    options = options or {}
+    try:
+        wavelength = float(wavelength_nm) * 1e-9
+        diameter = float(diameter_mm) * 1e-3
+        opts = {key: float(options[key]) * scale for key, _, _, scale in COUPLING_OPTIONS
+                if str(options.get(key, '')).strip()}
+    except ValueError:
+        raise ValueError("请输入有效的数字") from None
+    if wavelength == 0:
+        raise ValueError("波长不能为零")
+    mfd_m, fiber = resolve_mfd(mfd, wavelength)
+    f = float(focal_length(wavelength, diameter, mfd_m))
+    text = f"所需焦距: {f*1e3:.3f} mm"
+    if fiber:
+        text += f"\n{fiber} @ {wavelength*1e9:g} nm: MFD = {mfd_m*1e6:.2f} μm"
+    if opts:
+        eta = float(coupling_efficiency(wavelength, diameter, mfd_m, **opts))
+        text += f"\n耦合效率: {eta*100:.2f} %"
+    return f, text
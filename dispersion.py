@@ -0,0 +1,117 @@
+"""材料色散 (Sellmeier)
+
+从本地系数库 sellmeier.csv 读取材料，向量化计算折射率、群折射率、介质内波长与 GVD。
+系数文件只解析一次；每种材料的 n、n_g、GVD 在其适用波段上预先计算成密集表格并缓存，
+大规模光谱网格用 np.interp 查表 (exact=False)，需要精确值时用解析导数 (exact=True)。
+波长参数统一为 SI 单位 (m)。
+"""
+import csv
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from waveconvert import C
+
+SELLMEIER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sellmeier.csv')
+TABLE_POINTS = 8192
+
+
+@lru_cache(maxsize=None)
+def load_database(path=SELLMEIER_PATH):
+    """解析系数库，返回 {材料名: (B 数组, C 数组 [µm²], (λmin, λmax) [m], 来源)}"""
+    db = {}
+    with open(path, encoding='utf-8', newline='') as fh:
+        rows = csv.DictReader(line for line in fh if not line.lstrip().startswith('#'))
+        for row in rows:
+            b = np.array([float(row[f'B{i}']) for i in (1, 2, 3)])
+            c = np.array([float(row[f'C{i}']) for i in (1, 2, 3)])
+            rng = (float(row['lambda_min_um']) * 1e-6, float(row['lambda_max_um']) * 1e-6)
+            db[row['material'].strip()] = (b, c, rng, row.get('source', '').strip())
+    return db
+
+
+def materials():
+    """系数库中的材料名列表"""
+    return list(load_database())
+
+
+def _coefficients(material):
+    try:
+        return load_database()[material]
+    except KeyError:
+        raise KeyError(f"未知材料: {material}") from None
+
+
+def _sellmeier(material, wavelength):
+    """解析计算 n, dn/dλ, d²n/dλ² (λ 为 m，导数单位 1/m, 1/m²)"""
+    b, c, _, _ = _coefficients(material)
+    lam = np.asarray(wavelength, dtype=float)[..., None] * 1e6      # µm
+    den = lam ** 2 - c
+    n2 = 1 + np.sum(b * lam ** 2 / den, axis=-1)
+    dn2 = np.sum(-2 * b * c * lam / den ** 2, axis=-1)
+    d2n2 = np.sum(2 * b * c * (3 * lam ** 2 + c) / den ** 3, axis=-1)
+    n = np.sqrt(n2)
+    dn = dn2 / (2 * n)
+    d2n = (d2n2 - 2 * dn ** 2) / (2 * n)
+    return n, dn * 1e6, d2n * 1e12
+
+
+def _derived(wavelength, n, dn, d2n):
+    """由 n 及其导数得到 (n, n_g, GVD β₂ [s²/m])"""
+    lam = np.asarray(wavelength, dtype=float)
+    n_g = n - lam * dn
+    gvd = lam ** 3 / (2 * np.pi * C ** 2) * d2n
+    return n, n_g, gvd
+
+
+@lru_cache(maxsize=None)
+def dispersion_table(material):
+    """材料在适用波段内的 (λ 网格, n, n_g, GVD) 密集表格 (进程内缓存)"""
+    _, _, (lo, hi), _ = _coefficients(material)
+    grid = np.linspace(lo, hi, TABLE_POINTS)
+    n, n_g, gvd = _derived(grid, *_sellmeier(material, grid))
+    for arr in (grid, n, n_g, gvd):
+        arr.setflags(write=False)
+    return grid, n, n_g, gvd
+
+
+def evaluate(material, wavelength, exact=False):
+    """返回 (n, n_g, GVD [s²/m])
+
+    exact=False 时在缓存表格上插值 (超出适用波段的点退回解析计算)。
+    """
+    wavelength = np.asarray(wavelength, dtype=float)
+    if exact:
+        return _derived(wavelength, *_sellmeier(material, wavelength))
+    grid, n, n_g, gvd = dispersion_table(material)
+    out = [np.interp(wavelength, grid, t) for t in (n, n_g, gvd)]
+    outside = (wavelength < grid[0]) | (wavelength > grid[-1])
+    if np.any(outside):
+        exact_vals = _derived(wavelength, *_sellmeier(material, wavelength))
+        out = [np.where(outside, e, o) for e, o in zip(exact_vals, out)]
+    return tuple(out)
+
+
+def refractive_index(material, wavelength, exact=False):
+    return evaluate(material, wavelength, exact)[0]
+
+
+def group_index(material, wavelength, exact=False):
+    return evaluate(material, wavelength, exact)[1]
+
+
+def gvd(material, wavelength, exact=False):
+    """群速度色散 β₂ (s²/m)；乘以 1e27 得 fs²/mm"""
+    return evaluate(material, wavelength, exact)[2]
+
+
+def dispersion_parameter(material, wavelength, exact=False):
+    """色散参数 D = -2πc/λ² · β₂ (s/m²)；乘以 1e6 得 ps/(nm·km)"""
+    wavelength = np.asarray(wavelength, dtype=float)
+    return -2 * np.pi * C / wavelength ** 2 * gvd(material, wavelength, exact)
+
+
+def medium_wavelength(material, wavelength, exact=False):
+    """介质内波长 λ/n"""
+    return np.asarray(wavelength, dtype=float) / refractive_index(material, wavelength, exact)
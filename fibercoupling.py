@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
-import math
+
+from coupling import COUPLING_OPTIONS, coupling_from_inputs
 
 class FiberCouplerCalculator:
     def __init__(self, root):
@@ -8,8 +9,8 @@ class FiberCouplerCalculator:
         self.root.title("耦合头焦距计算器")
         
         # 设置窗口大小和位置
-        self.root.geometry("800x600+200+200")  # 宽800，高600，位置(200,200)
-        self.root.minsize(700, 500)  # 最小尺寸
+        self.root.geometry("800x820+200+100")  # 宽800，高820，位置(200,100)
+        self.root.minsize(700, 720)  # 最小尺寸
         
         # 配置主窗口的权重，使其可以自适应
         self.root.columnconfigure(0, weight=1)
@@ -42,11 +43,20 @@ class FiberCouplerCalculator:
         ttk.Label(input_frame, text="mm", font=('微软雅黑', 12)).grid(row=1, column=2, sticky="w", padx=(0, 10))
         
         # MFD输入
-        ttk.Label(input_frame, text="模场直径MFD (μm):", font=('微软雅黑', 12)).grid(row=2, column=0, sticky="w", pady=10)
+        ttk.Label(input_frame, text="MFD (μm) 或光纤型号:", font=('微软雅黑', 12)).grid(row=2, column=0, sticky="w", pady=10)
         self.mfd_entry = ttk.Entry(input_frame, width=15, font=('Consolas', 12))
         self.mfd_entry.grid(row=2, column=1, padx=15, pady=10, sticky="ew")
         ttk.Label(input_frame, text="μm", font=('微软雅黑', 12)).grid(row=2, column=2, sticky="w", padx=(0, 10))
         
+        # 实际透镜与对准误差 (可选，留空按理想情况计算)
+        self.option_entries = {}
+        for row, (key, label, unit, _) in enumerate(COUPLING_OPTIONS, start=3):
+            ttk.Label(input_frame, text=f"{label} ({unit}):", font=('微软雅黑', 12)).grid(row=row, column=0, sticky="w", pady=6)
+            entry = ttk.Entry(input_frame, width=15, font=('Consolas', 12))
+            entry.grid(row=row, column=1, padx=15, pady=6, sticky="ew")
+            ttk.Label(input_frame, text=unit, font=('微软雅黑', 12)).grid(row=row, column=2, sticky="w", padx=(0, 10))
+            self.option_entries[key] = entry
+        
         # 计算按钮 - 增大按钮
         calc_btn = ttk.Button(main_frame, text="计算焦距", command=self.calculate, style='Big.TButton')
         calc_btn.grid(row=1, column=0, pady=20)
@@ -71,7 +81,8 @@ class FiberCouplerCalculator:
         
         info_text = (
             "使用说明：\n"
-            "• 输入波长（纳米）、光斑直径（毫米）、模场直径（微米）\n"
+            "• 输入波长（纳米）、光斑直径（毫米）、模场直径（微米）或光纤型号（如 SMF-28）\n"
+            "• 可选填实际焦距与偏移/倾角/离焦，计算高斯模式重叠耦合效率\n"
             "• 点击计算焦距按钮获取最佳耦合焦距\n"
             "• 计算公式：f = (π × D × MFD) / (4 × λ)"
         )
@@ -80,20 +91,13 @@ class FiberCouplerCalculator:
 
     def calculate(self):
         try:
-            # 获取输入值并转换单位到米
-            λ = float(self.wavelength_entry.get()) * 1e-9   # nm → m
-            D = float(self.spot_entry.get()) * 1e-3         # mm → m
-            MFD = float(self.mfd_entry.get()) * 1e-6        # μm → m
-
-            # 执行计算
-            f = (math.pi * D * MFD) / (4 * λ)
-            
-            # 转换结果为毫米并显示
-            self.result_var.set(f"所需焦距: {f*1e3:.3f} mm")
-        except ValueError:
-            self.result_var.set("错误: 请输入有效的数字")
-        except ZeroDivisionError:
-            self.result_var.set("错误: 波长不能为零")
+            # 输入解析与计算在 coupling 中 (与光电计算器共用)
+            options = {key: entry.get() for key, entry in self.option_entries.items()}
+            _, text = coupling_from_inputs(self.wavelength_entry.get(), self.spot_entry.get(),
+                                           self.mfd_entry.get(), options)
+            self.result_var.set(text)
+        except ValueError as e:
+            self.result_var.set(f"错误: {e}")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,332 @@
+"""仪器实时数据接入: 本地 socket / 管道 -> 定长环形缓冲 -> 滚动统计
+
+数据格式: 每行一个读数 "数值 [功率]" (空白或逗号分隔，# 开头为注释)，数值与功率单位在连接时指定，
+如波长计输出 nm + dBm。读取线程按块解析 (每次 recv/read 得到的全部完整行)，用与 GUI 相同的
+换算公式 (convert_abs / power_to_mw) 向量化换算成 (时间, 频率 Hz, 功率 mW) 后写入环形缓冲；
+GUI 以较低频率 (如 10 Hz) 取最近一段数据计算均值、标准差与漂移 (线性拟合斜率)，
+kHz 读数率下主循环也不会积压。
+
+模拟器 (代替真实仪器，便于测试):
+    python instrument.py simulate --port 5025 --rate 2000
+    python instrument.py simulate --rate 1000 | python instrument.py monitor -
+    python instrument.py monitor 127.0.0.1:5025
+"""
+import argparse
+import os
+import select
+import socket
+import sys
+import threading
+import time
+from functools import partial
+
+import numpy as np
+
+from batchconvert import is_data, parse_column, split_line
+from waveconvert import POWER_UNITS, convert_abs, power_to_mw, unit_type
+
+DEFAULT_CAPACITY = 1 << 16      # 约 65 s @ 1 kHz
+STATS_WINDOW = 1.0              # 滚动统计窗口 (s)
+READ_SIZE = 1 << 16
+COLUMNS = ('t', 'f', 'p_mw')
+
+
+class RingBuffer:
+    """定长、以 numpy 数组为底的环形缓冲 (线程安全)；count 为累计写入行数"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, columns=len(COLUMNS)):
+        self.capacity = capacity
+        self._data = np.full((capacity, columns), np.nan)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def extend(self, rows):
+        """追加一块数据 (n, columns)；超过容量时只保留最后 capacity 行"""
+        rows = np.asarray(rows, dtype=float).reshape(-1, self._data.shape[1])
+        total = len(rows)
+        rows = rows[-self.capacity:]
+        n = len(rows)
+        with self._lock:
+            start = (self.count + total - n) % self.capacity
+            first = min(n, self.capacity - start)
+            self._data[start:start + first] = rows[:first]
+            self._data[:n - first] = rows[first:]
+            self.count += total
+
+    def _tail(self, n):
+        # 调用者需持有锁
+        n = min(n, self.count, self.capacity)
+        idx = np.arange(self.count - n, self.count) % self.capacity
+        return self._data[idx]
+
+    def latest(self, n=None):
+        """最近 n 行 (按时间顺序的副本)，默认全部有效数据"""
+        with self._lock:
+            return self._tail(self.capacity if n is None else n)
+
+    def since(self, count):
+        """累计计数 count 之后写入的行 (最多 capacity 行) 及当前计数 (同一次加锁内取得)"""
+        with self._lock:
+            current = self.count
+            return self._tail(current - count), current
+
+
+class Instrument:
+    """从字节流读取读数: 读取线程解析、换算并写入 self.buffer
+
+    read(size) -> bytes 为数据来源 (socket.recv、os.read 等)，返回 b'' 表示结束。
+    也可不启动线程，直接调用 feed(data) 注入数据。
+    """
+
+    def __init__(self, read, unit='nm', power_unit='dBm', capacity=DEFAULT_CAPACITY, close=None):
+        unit_type(unit)
+        if power_unit not in POWER_UNITS:
+            raise ValueError(f"未知功率单位: {power_unit}")
+        self.unit = unit
+        self.power_unit = power_unit
+        self.buffer = RingBuffer(capacity)
+        self.error = None
+        self._read = read
+        self._close = close
+        self._partial = b''
+        self._last_t = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def connect(cls, host, port, timeout=5.0, **kwargs):
+        """连接本地 TCP 端口 (如仪器的 SCPI 数据流或模拟器)"""
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.settimeout(0.5)
+        return cls(sock.recv, close=sock.close, **kwargs)
+
+    @classmethod
+    def open_pipe(cls, path, **kwargs):
+        """从命名管道 / 文件读取，path 为 '-' 时读取 stdin"""
+        if path == '-':
+            fd = sys.stdin.fileno()
+            return cls(lambda size: os.read(fd, size), **kwargs)
+        # 非阻塞打开: 管道尚无写端时 os.open 不会卡住 GUI 线程
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NONBLOCK', 0))
+        return cls(partial(_read_fd, fd), close=lambda: os.close(fd), **kwargs)
+
+    @classmethod
+    def open(cls, source, **kwargs):
+        """source 为 'host:port' 时连接 socket，否则按管道路径打开"""
+        host, sep, port = source.rpartition(':')
+        if sep and port.isdigit() and not os.path.exists(source):
+            return cls.connect(host or '127.0.0.1', int(port), **kwargs)
+        return cls.open_pipe(source, **kwargs)
+
+    def feed(self, data, now=None):
+        """解析一段字节数据中的完整行，换算后整块写入缓冲；返回写入的行数
+
+        同一块内的读数时间在上一块与本块到达时刻之间均匀分布。
+        """
+        now = time.monotonic() if now is None else now
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()
+        fields = [split_line(line.replace(',', ' '), None)
+                  for line in (raw.decode('ascii', 'replace') for raw in lines) if is_data(line)]
+        if not fields:
+            return 0
+        values = parse_column(fields, 0)
+        keep = np.isfinite(values)
+        n = int(keep.sum())
+        if not n:
+            return 0
+        start = now if self._last_t is None else self._last_t
+        self._last_t = now
+        rows = np.empty((n, len(COLUMNS)))
+        rows[:, 0] = np.linspace(start, now, n + 1)[1:]
+        rows[:, 1] = convert_abs(values[keep], self.unit, 'Hz')
+        rows[:, 2] = power_to_mw(parse_column(fields, 1)[keep], self.power_unit)
+        self.buffer.extend(rows)
+        return n
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='instrument', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._close:
+            try:
+                self._close()
+            except OSError:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    data = self._read(READ_SIZE)
+                except socket.timeout:
+                    continue
+                if not data:
+                    break
+                self.feed(data)
+        except (OSError, ValueError) as e:
+            if not self._stop.is_set():
+                self.error = e
+
+
+def _read_fd(fd, size, timeout=0.5):
+    """带超时读取非阻塞描述符；无数据时抛出 socket.timeout，由读取线程重试"""
+    if os.name == 'posix' and not select.select([fd], [], [], timeout)[0]:
+        raise socket.timeout
+    try:
+        return os.read(fd, size)
+    except BlockingIOError:
+        raise socket.timeout from None
+
+
+def rolling_stats(rows, window=STATS_WINDOW):
+    """最近 window 秒内读数的统计: 均值、标准差、漂移 (频率对时间的线性拟合斜率 Hz/s) 与读数率"""
+    if len(rows):
+        rows = rows[rows[:, 0] >= rows[-1, 0] - window]
+    n = len(rows)
+    if not n:
+        return None
+    t, f, p = rows[:, 0], rows[:, 1], rows[:, 2]
+    span = t[-1] - t[0]
+    drift = np.polyfit(t - t[0], f, 1)[0] if n > 2 and span > 0 else 0.0
+    return {
+        'n': n,
+        'f_mean': float(f.mean()),
+        'f_std': float(f.std(ddof=1)) if n > 1 else 0.0,
+        'drift': float(drift),
+        'p_mw': float(np.nanmean(p)) if np.isfinite(p).any() else None,
+        'rate': (n - 1) / span if span > 0 else 0.0,
+    }
+
+
+def format_stats(stats, unit='nm'):
+    """滚动统计的简短文本 (GUI / 终端共用)"""
+    if not stats:
+        return "无数据"
+    f = stats['f_mean']
+    text = (f"均值 {f / 1e12:.9g} THz = {float(convert_abs(f, 'Hz', unit)):.9g} {unit}\n"
+            f"标准差 {stats['f_std'] / 1e6:.4g} MHz   漂移 {stats['drift'] / 1e6:+.4g} MHz/s\n"
+            f"{stats['n']} 个读数 @ {stats['rate']:.0f} Hz")
+    if stats['p_mw'] is not None:
+        text += f"   功率 {stats['p_mw']:.4g} mW"
+    return text
+
+
+# --- 模拟器 ---
+
+def simulate_blocks(center=1550.0, unit='nm', rate=1000.0, noise=1e-4, drift=1e-5, power_dbm=0.0,
+                    block_s=0.01, seed=None, stop=None):
+    """按实时速率产出模拟读数的文本块 (bytes)：中心值 + 高斯噪声 + 线性漂移 (单位/s)"""
+    rng = np.random.default_rng(seed)
+    t0 = time.monotonic()
+    sent = 0
+    while stop is None or not stop.is_set():
+        elapsed = time.monotonic() - t0
+        n = int(elapsed * rate) - sent
+        if n <= 0:
+            time.sleep(block_s)
+            continue
+        t = (sent + np.arange(n)) / rate
+        values = center + drift * t + rng.normal(0, noise, n)
+        power = power_dbm + rng.normal(0, 0.01, n)
+        sent += n
+        yield ''.join(f"{v:.8f} {p:.4f}\n" for v, p in zip(values.tolist(), power.tolist())).encode()
+
+
+def run_simulator(write, stop=None, **kwargs):
+    """把模拟读数持续写入 write (如 socket.sendall、管道写端)，直到 stop 被设置或对端关闭"""
+    try:
+        for block in simulate_blocks(stop=stop, **kwargs):
+            write(block)
+    except (BrokenPipeError, ConnectionError):
+        pass
+
+
+def simulate_pipe(**kwargs):
+    """进程内模拟器: 返回 (读取端的 Instrument, stop 事件)，模拟线程写入 socketpair
+
+    读取端与 connect() 相同 (带超时的 recv)，Instrument.stop() 时关闭读取端，
+    写入端随之收到 BrokenPipe 并关闭，两端都不会泄漏。
+    """
+    reader, writer_sock = socket.socketpair()
+    reader.settimeout(0.5)
+    stop = threading.Event()
+
+    def writer():
+        with writer_sock:
+            run_simulator(writer_sock.sendall, stop=stop, **kwargs)
+
+    def close():
+        stop.set()
+        reader.close()
+
+    threading.Thread(target=writer, name='simulator', daemon=True).start()
+    return Instrument(reader.recv, unit=kwargs.get('unit', 'nm'), close=close), stop
+
+
+def serve_simulator(host='127.0.0.1', port=5025, **kwargs):
+    """本地 TCP 模拟器：依次接受客户端，向每个客户端持续发送模拟读数"""
+    with socket.create_server((host, port)) as server:
+        print(f"模拟器监听 {host}:{port}", file=sys.stderr)
+        while True:
+            conn, addr = server.accept()
+            with conn:
+                print(f"客户端 {addr[0]}:{addr[1]} 已连接", file=sys.stderr)
+                run_simulator(conn.sendall, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="仪器实时数据接入与模拟器")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sim = sub.add_parser('simulate', help="模拟仪器输出 (TCP 端口或 stdout)")
+    sim.add_argument('--port', type=int, help="监听的本地端口；省略时写到 stdout")
+    sim.add_argument('--rate', type=float, default=1000.0, help="读数率 (Hz)")
+    sim.add_argument('--center', type=float, default=1550.0, help="中心值 (nm)")
+    sim.add_argument('--noise', type=float, default=1e-4, help="噪声标准差 (nm)")
+    sim.add_argument('--drift', type=float, default=1e-5, help="漂移 (nm/s)")
+    mon = sub.add_parser('monitor', help="连接数据源并在终端打印滚动统计")
+    mon.add_argument('source', help="host:port 或管道路径 (- 为 stdin)")
+    mon.add_argument('--unit', default='nm', help="读数单位，默认 %(default)s")
+    mon.add_argument('--power-unit', default='dBm', choices=POWER_UNITS)
+    mon.add_argument('--interval', type=float, default=0.5, help="打印间隔 (s)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'simulate':
+        opts = dict(center=args.center, rate=args.rate, noise=args.noise, drift=args.drift)
+        try:
+            if args.port:
+                serve_simulator(port=args.port, **opts)
+            else:
+                run_simulator(lambda b: (sys.stdout.buffer.write(b), sys.stdout.buffer.flush()), **opts)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    try:
+        inst = Instrument.open(args.source, unit=args.unit, power_unit=args.power_unit).start()
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"错误: {e}\n")
+    try:
+        while inst.running:
+            time.sleep(args.interval)
+            print(format_stats(rolling_stats(inst.buffer.latest()), args.unit), end='\n\n', flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        inst.stop()
+    if inst.error:
+        parser.exit(1, f"错误: {inst.error}\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
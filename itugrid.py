@@ -0,0 +1,106 @@
+"""ITU-T 波分复用信道栅格与批量最近信道查询
+
+内置 G.694.1 DWDM (100/50/25 GHz 固定栅格，6.25 GHz 灵活栅格中心频率) 与
+G.694.2 CWDM (1271~1611 nm，20 nm 间隔) 栅格，预先生成升序的频率数组，
+查询时用二分查找 (np.searchsorted) 把测量值映射到最近信道及其频率偏移 (GHz)。
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from waveconvert import C, convert_abs
+
+ANCHOR = 193.1e12               # G.694.1 锚定频率 Hz
+DWDM_RANGE = (184.5e12, 196.5e12)   # 预生成的 DWDM 频率范围 (覆盖 S/C/L 波段)
+CWDM_NM = np.arange(1271, 1612, 20)
+
+
+class Grid:
+    """一张信道表: 升序频率数组 + 信道编号 n"""
+
+    def __init__(self, name, freq, n, label):
+        order = np.argsort(freq)
+        self.name = name
+        self.freq = np.asarray(freq, dtype=float)[order]
+        self.n = np.asarray(n)[order]
+        self._label = label
+        self.freq.setflags(write=False)
+
+    def __len__(self):
+        return len(self.freq)
+
+    def label(self, n):
+        return self._label(n)
+
+    def lookup(self, values, unit='Hz'):
+        """批量最近信道: 返回 (表中下标, 信道编号 n, 中心频率 Hz, 偏移 GHz)
+
+        values 可为任意 UNIT_FACTORS 绝对单位 (频率/波长/波数) 的数组。
+        """
+        f = convert_abs(values, unit, 'Hz')
+        pos = np.searchsorted(self.freq, f)
+        lo = np.clip(pos - 1, 0, len(self) - 1)
+        hi = np.clip(pos, 0, len(self) - 1)
+        idx = np.where(np.abs(f - self.freq[lo]) <= np.abs(self.freq[hi] - f), lo, hi)
+        center = self.freq[idx]
+        return idx, self.n[idx], center, (f - center) / 1e9
+
+
+def _dwdm(spacing_ghz):
+    step = spacing_ghz * 1e9
+    n = np.arange(np.ceil((DWDM_RANGE[0] - ANCHOR) / step), np.floor((DWDM_RANGE[1] - ANCHOR) / step) + 1)
+
+    def label(k):
+        # 常用信道号: 100 GHz 栅格上 C31 = 193.1 THz，即 (f − 190 THz) / 100 GHz
+        return f"C{(ANCHOR + k * step - 190e12) / 100e9:g}"
+
+    return Grid(f'dwdm{spacing_ghz:g}', ANCHOR + n * step, n.astype(int), label)
+
+
+def _flexgrid():
+    step = 6.25e9
+    n = np.arange(np.ceil((DWDM_RANGE[0] - ANCHOR) / step), np.floor((DWDM_RANGE[1] - ANCHOR) / step) + 1)
+    return Grid('flexgrid', ANCHOR + n * step, n.astype(int), lambda k: f"n={k:+d}")
+
+
+def _cwdm():
+    return Grid('cwdm', C / (CWDM_NM * 1e-9), CWDM_NM, lambda k: f"CWDM {k}")
+
+
+_BUILDERS = {
+    'dwdm100': lambda: _dwdm(100),
+    'dwdm50': lambda: _dwdm(50),
+    'dwdm25': lambda: _dwdm(25),
+    'flexgrid': _flexgrid,
+    'cwdm': _cwdm,
+}
+GRID_NAMES = tuple(_BUILDERS)
+
+
+@lru_cache(maxsize=None)
+def get_grid(name):
+    """按名称取得 (并缓存) 信道表"""
+    try:
+        return _BUILDERS[name]()
+    except KeyError:
+        raise KeyError(f"未知栅格: {name}，可选 {', '.join(GRID_NAMES)}") from None
+
+
+def lookup(values, unit='Hz', grid='dwdm100'):
+    """批量最近信道查询的便捷入口，见 Grid.lookup"""
+    return get_grid(grid).lookup(values, unit)
+
+
+def describe(f_hz):
+    """单个频率的简短信道说明 (GUI 用)：DWDM 50 GHz 范围内给出信道号，否则尝试 CWDM"""
+    if not f_hz or f_hz <= 0:
+        return ""
+    if DWDM_RANGE[0] - 25e9 <= f_hz <= DWDM_RANGE[1] + 25e9:
+        g = get_grid('dwdm50')
+        _, n, _, off = g.lookup(f_hz)
+        return f"ITU {g.label(int(n))} {float(off):+.2f} GHz"
+    g = get_grid('cwdm')
+    _, n, center, off = g.lookup(f_hz)
+    if abs(C / f_hz - C / float(center)) <= 6.5e-9:      # CWDM 通带约 ±6.5 nm
+        return f"{g.label(int(n))} {float(off):+.1f} GHz"
+    return ""
@@ -0,0 +1,134 @@
+"""GUI 后台任务: 把耗时计算放到线程池 / 进程池，在 Tk 主线程中回调结果
+
+每个面板 (panel) 只保留最新的任务: 提交新任务时旧任务被取消，旧结果即使算完也会被丢弃，
+输入快速变化时不会堆积过时的计算。进度与结果通过 root.after 定时轮询送回主线程，
+工作线程从不直接操作 Tk 控件。
+
+线程任务以 fn(job, *args) 调用，可用 job.progress(done, total) 报告进度；
+取消后下一次调用 job.progress / job.check 会抛出 JobCancelled 以尽快结束。
+进程任务 (process=True) 以 fn(*args) 调用，fn 与参数需可 pickle；只能在开始执行前取消，
+已开始的进程任务算完后结果被丢弃。
+"""
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+POLL_MS = 50
+
+
+class JobCancelled(Exception):
+    """任务已被取消 (被同一面板的新任务取代或用户手动取消)"""
+
+
+class Job:
+    def __init__(self, panel, progress_queue):
+        self.panel = panel
+        self.future = None
+        self._queue = progress_queue
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check(self):
+        """在工作线程中调用：任务已取消时抛出 JobCancelled"""
+        if self._cancel.is_set():
+            raise JobCancelled(self.panel)
+
+    def progress(self, done, total=1.0, message=""):
+        """在工作线程中调用：报告进度 (done / total)，同时检查是否已取消"""
+        self.check()
+        self._queue.put((self, done / total if total else 1.0, message))
+
+
+class JobRunner:
+    def __init__(self, root, max_workers=2, poll_ms=POLL_MS):
+        self.root = root
+        self.max_workers = max_workers
+        self.poll_ms = poll_ms
+        self._threads = ThreadPoolExecutor(max_workers, thread_name_prefix='job')
+        self._processes = None
+        self._latest = {}           # panel -> (job, on_done, on_error, on_progress)
+        self._queue = queue.SimpleQueue()
+        self._polling = False
+
+    def submit(self, panel, fn, *args, on_done=None, on_error=None, on_progress=None, process=False):
+        """提交任务 (取代该面板尚未完成的任务)，回调均在 Tk 主线程中执行
+
+        on_done(result)、on_error(exc)、on_progress(fraction, message)。
+        """
+        self.cancel(panel)
+        job = Job(panel, self._queue)
+        if process:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(self.max_workers)
+            job.future = self._processes.submit(fn, *args)
+        else:
+            job.future = self._threads.submit(fn, job, *args)
+        self._latest[panel] = (job, on_done, on_error, on_progress)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return job
+
+    def cancel(self, panel):
+        """取消该面板的当前任务 (没有任务时什么也不做)"""
+        entry = self._latest.pop(panel, None)
+        if entry:
+            entry[0].cancel()
+
+    def busy(self, panel):
+        return panel in self._latest
+
+    def shutdown(self):
+        """关闭窗口时调用：取消全部任务并释放线程 / 进程池"""
+        for panel in list(self._latest):
+            self.cancel(panel)
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+
+    def _is_current(self, job):
+        entry = self._latest.get(job.panel)
+        return entry is not None and entry[0] is job
+
+    def _poll(self):
+        # 进度: 只转发仍是最新任务的消息，同一任务只取最后一条
+        updates = {}
+        while True:
+            try:
+                job, fraction, message = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if self._is_current(job):
+                updates[job.panel] = (fraction, message)
+        for panel, (fraction, message) in updates.items():
+            on_progress = self._latest[panel][3]
+            if on_progress:
+                on_progress(fraction, message)
+
+        for panel, (job, on_done, on_error, _) in list(self._latest.items()):
+            if not job.future.done():
+                continue
+            del self._latest[panel]
+            if job.future.cancelled():
+                continue
+            exc = job.future.exception()
+            if isinstance(exc, JobCancelled):
+                continue
+            if exc is not None:
+                if on_error:
+                    on_error(exc)
+            elif on_done:
+                on_done(job.future.result())
+
+        if self._latest:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
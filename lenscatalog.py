@@ -0,0 +1,120 @@
+"""本地透镜库存目录与最近焦距查询
+
+从 CSV 读取透镜目录，按焦距排序成数组索引，用二分查找为 (批量) 理想焦距
+返回最近的 k 个库存透镜及其模式失配效率。解析后的索引缓存为同目录下的
+<catalog>.cache.npz，源文件未改动时下次直接加载。
+
+CSV 格式 (首行为表头，focal_mm 必需，其余可选)，示例见 lens_catalog.example.csv
+(复制为 lens_catalog.csv，或用环境变量 LENS_CATALOG 指定路径即可在 GUI 中启用):
+    part,vendor,focal_mm
+    AL-4.5,xx,4.51
+"""
+import csv
+import os
+
+import numpy as np
+
+# 默认目录位置，可用环境变量 LENS_CATALOG 覆盖
+DEFAULT_CATALOG = os.environ.get(
+    'LENS_CATALOG', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lens_catalog.csv'))
+
+
+def mismatch_efficiency(f_stock, f_ideal):
+    """焦距偏离导致的高斯模式失配耦合效率
+
+    聚焦光斑直径与 f 成正比，r = f_stock / f_ideal，η = (2r / (1 + r²))²
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = np.asarray(f_stock, dtype=float) / np.asarray(f_ideal, dtype=float)
+        return (2 * r / (1 + r ** 2)) ** 2
+
+
+class LensCatalog:
+    """按焦距排序的数组索引"""
+
+    def __init__(self, focal, part, vendor):
+        order = np.argsort(focal, kind='stable')
+        self.focal = np.asarray(focal, dtype=float)[order]      # m
+        self.part = np.asarray(part, dtype=str)[order]
+        self.vendor = np.asarray(vendor, dtype=str)[order]
+
+    def __len__(self):
+        return len(self.focal)
+
+    @classmethod
+    def from_csv(cls, path):
+        """解析 CSV 目录 (焦距列单位为 mm)"""
+        focal, part, vendor = [], [], []
+        with open(path, encoding='utf-8-sig', newline='') as fh:
+            for i, row in enumerate(csv.DictReader(fh)):
+                try:
+                    f_mm = float(row['focal_mm'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                focal.append(f_mm * 1e-3)
+                part.append((row.get('part') or f"#{i}").strip())
+                vendor.append((row.get('vendor') or '').strip())
+        return cls(focal, part, vendor)
+
+    @classmethod
+    def load(cls, path=DEFAULT_CATALOG):
+        """加载目录，优先使用磁盘缓存"""
+        st = os.stat(path)
+        stamp = np.array([st.st_mtime_ns, st.st_size], dtype=np.int64)
+        cache = path + '.cache.npz'
+        try:
+            with np.load(cache) as z:
+                if np.array_equal(z['stamp'], stamp):
+                    return cls(z['focal'], z['part'], z['vendor'])
+        except (OSError, KeyError, ValueError):
+            pass
+        cat = cls.from_csv(path)
+        try:
+            tmp = cache + '.tmp.npz'
+            np.savez(tmp, stamp=stamp, focal=cat.focal, part=cat.part, vendor=cat.vendor)
+            os.replace(tmp, cache)
+        except OSError:
+            pass   # 目录只读时不缓存
+        return cat
+
+    def nearest(self, f_ideal, k=3):
+        """批量查询最近的 k 个焦距，返回 (索引, 库存焦距, 失配效率)，形状为 (..., k)
+
+        先二分查找插入位置，只在其两侧 k 个候选中比较，复杂度 O(n_query·(log N + k))。
+        """
+        if len(self) == 0:
+            raise ValueError("透镜目录为空")
+        k = min(k, len(self))
+        f_ideal = np.asarray(f_ideal, dtype=float)
+        q = f_ideal.reshape(-1, 1)
+        pos = np.searchsorted(self.focal, q[:, 0])
+        # 候选窗口 [pos-k, pos+k)，靠近两端时整体平移而不是截断，避免重复候选
+        width = min(2 * k, len(self))
+        start = np.clip(pos - k, 0, len(self) - width)
+        cand = start[:, None] + np.arange(width)
+        dist = np.abs(self.focal[cand] - q)
+        pick = np.argsort(dist, axis=1, kind='stable')[:, :k]
+        idx = np.take_along_axis(cand, pick, axis=1)
+        shape = f_ideal.shape + (k,)
+        f_stock = self.focal[idx]
+        return idx.reshape(shape), f_stock.reshape(shape), \
+            mismatch_efficiency(f_stock, q).reshape(shape)
+
+
+_default = {'stamp': None, 'catalog': None}
+
+
+def default_catalog():
+    """默认目录；文件未改动时复用已加载的索引，文件不存在时返回 None
+
+    缺失不缓存：运行中添加或修改目录文件后，下次调用即生效，无需重启。
+    """
+    try:
+        st = os.stat(DEFAULT_CATALOG)
+    except FileNotFoundError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    if _default['stamp'] != stamp:
+        _default['catalog'] = LensCatalog.load(DEFAULT_CATALOG)
+        _default['stamp'] = stamp
+    return _default['catalog']
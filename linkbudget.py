@@ -0,0 +1,141 @@
+"""光链路功率预算 (向量化)
+
+把链路上的元件 (光纤、连接器、熔接点、分光器、固定损耗/增益) 表示为 dB 数组，
+一次性对成千上万条链路求和，得到接收功率与余量。全部在 dB 域中相加，
+只有输出 mW/W 时才调用 waveconvert 的功率换算。
+
+链路表 CSV 的列 (缺省列按 0 处理):
+    name, tx_dbm, sensitivity_dbm, fiber_km, connectors, splices, split, extra_loss_db, gain_db
+
+示例:
+    python linkbudget.py links.csv --db-per-km 0.35 --connector-db 0.5 > budget.csv
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from waveconvert import convert_power
+
+# 典型单模链路参数 (可在命令行覆盖)
+DEFAULTS = {
+    'db_per_km': 0.35,      # 1310 nm 单模光纤衰减
+    'connector_db': 0.5,    # 每个连接器
+    'splice_db': 0.1,       # 每个熔接点
+    'splitter_excess_db': 0.0,
+}
+
+LINK_COLUMNS = ('tx_dbm', 'sensitivity_dbm', 'fiber_km', 'connectors', 'splices',
+                'split', 'extra_loss_db', 'gain_db')
+
+
+def splitter_loss_db(split, excess_db=0.0):
+    """分光器插损: split >= 1 视为 1:N 均分，0 < split < 1 视为该端口的分光比"""
+    split = np.asarray(split, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(split >= 1, 1.0 / np.maximum(split, 1), split)
+        loss = -10 * np.log10(ratio)
+    return np.where(split > 0, loss + excess_db, 0.0)
+
+
+def component_loss_db(kind, value, **params):
+    """单类元件的损耗 (dB，增益为负)，value 可为数组"""
+    value = np.asarray(value, dtype=float)
+    if kind == 'fiber':
+        return value * params.get('db_per_km', DEFAULTS['db_per_km'])
+    if kind == 'connector':
+        return value * params.get('connector_db', DEFAULTS['connector_db'])
+    if kind == 'splice':
+        return value * params.get('splice_db', DEFAULTS['splice_db'])
+    if kind == 'splitter':
+        return splitter_loss_db(value, params.get('excess_db', DEFAULTS['splitter_excess_db']))
+    if kind == 'loss':
+        return value
+    if kind == 'gain':
+        return -value
+    raise ValueError(f"未知元件类型: {kind}")
+
+
+def chain_loss_db(chain):
+    """链路元件序列的总损耗；chain 为 (kind, value, params) 或 (kind, value) 的序列
+
+    每个 value 可以是标量或长度为链路数的数组，按广播规则相加。
+    """
+    total = np.float64(0.0)
+    for item in chain:
+        kind, value, *params = item
+        total = total + component_loss_db(kind, value, **(params[0] if params else {}))
+    return total
+
+
+def link_budget(tx, sensitivity_dbm, chain, tx_unit='dBm'):
+    """计算所有链路的接收功率与余量，返回各项数组组成的字典"""
+    tx_dbm = convert_power(tx, tx_unit, 'dBm')
+    loss_db = chain_loss_db(chain)
+    rx_dbm = tx_dbm - loss_db
+    margin_db = rx_dbm - np.asarray(sensitivity_dbm, dtype=float)
+    rx_dbm, margin_db, loss_db = np.broadcast_arrays(rx_dbm, margin_db, loss_db)
+    return {
+        'loss_db': loss_db,
+        'rx_dbm': rx_dbm,
+        'rx_mw': convert_power(rx_dbm, 'dBm', 'mW'),
+        'margin_db': margin_db,
+        'ok': margin_db >= 0,
+    }
+
+
+def load_links(path):
+    """读取链路表 CSV，返回 (名称数组, 各列数组字典)"""
+    table = np.genfromtxt(path, delimiter=',', names=True, dtype=None, encoding='utf-8',
+                          autostrip=True, ndmin=1)
+    n = len(table)
+    fields = table.dtype.names
+    names = table['name'].astype(str) if 'name' in fields else np.arange(n).astype(str)
+    cols = {c: (np.nan_to_num(table[c].astype(float)) if c in fields else np.zeros(n))
+            for c in LINK_COLUMNS}
+    return names, cols
+
+
+def budget_from_table(cols, **params):
+    """由链路表各列组装元件链并计算预算"""
+    p = dict(DEFAULTS, **params)
+    chain = [
+        ('fiber', cols['fiber_km'], {'db_per_km': p['db_per_km']}),
+        ('connector', cols['connectors'], {'connector_db': p['connector_db']}),
+        ('splice', cols['splices'], {'splice_db': p['splice_db']}),
+        ('splitter', cols['split'], {'excess_db': p['splitter_excess_db']}),
+        ('loss', cols['extra_loss_db']),
+        ('gain', cols['gain_db']),
+    ]
+    return link_budget(cols['tx_dbm'], cols['sensitivity_dbm'], chain)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量计算光链路功率预算")
+    parser.add_argument('links', help="链路表 CSV")
+    parser.add_argument('-o', '--output', default='-', help="输出 CSV，缺省为 stdout")
+    for key, val in DEFAULTS.items():
+        parser.add_argument('--' + key.replace('_', '-'), type=float, default=val,
+                            help=f"(默认 {val})")
+    args = parser.parse_args(argv)
+
+    names, cols = load_links(args.links)
+    params = {k: getattr(args, k) for k in DEFAULTS}
+    res = budget_from_table(cols, **params)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        out.write("name,loss_db,rx_dbm,rx_mw,margin_db,ok\n")
+        for row in zip(names, res['loss_db'], res['rx_dbm'], res['rx_mw'],
+                       res['margin_db'], res['ok']):
+            out.write(f"{row[0]},{row[1]:.3f},{row[2]:.3f},{row[3]:.6g},{row[4]:.3f},{int(row[5])}\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    n_fail = int(np.count_nonzero(~res['ok']))
+    print(f"{len(names)} 条链路，余量不足 {n_fail} 条", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
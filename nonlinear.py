@@ -0,0 +1,89 @@
+"""非线性频率变换组合计算: SHG / THG / SFG / DFG
+
+在频率域中对泵浦与信号列表做外积:
+    SHG  f = 2·f_p          THG  f = 3·f_p
+    SFG  f = f_p + f_s      DFG  f = |f_p − f_s|
+组合数随列表长度平方增长，按泵浦行分块广播 (每块约 chunk 个组合)，
+只保留落在目标波段内的结果，内存占用与总组合数无关。
+"""
+import numpy as np
+
+from waveconvert import convert_abs, unit_type
+
+PROCESSES = ('SHG', 'THG', 'SFG', 'DFG')
+DEFAULT_CHUNK = 1 << 20
+
+RESULT_DTYPE = np.dtype([('process', 'U3'), ('i', np.int64), ('j', np.int64), ('freq', np.float64)])
+
+
+def band_to_hz(band, unit):
+    """目标波段 (任意绝对单位) -> 升序频率区间 (Hz)，band 为 None 时不限制"""
+    if band is None:
+        return -np.inf, np.inf
+    lo, hi = sorted(float(v) for v in convert_abs(np.asarray(band, dtype=float), unit, 'Hz'))
+    return lo, hi
+
+
+def _records(process, i, j, freq):
+    out = np.empty(len(freq), dtype=RESULT_DTYPE)
+    out['process'] = process
+    out['i'] = i
+    out['j'] = j
+    out['freq'] = freq
+    return out
+
+
+def iter_mixing(pumps, signals=None, unit='nm', processes=PROCESSES, band=None, band_unit=None,
+                chunk=DEFAULT_CHUNK, progress=None):
+    """分块产出落在目标波段内的组合 (结构化数组: process, i, j, freq[Hz])
+
+    i 为泵浦下标，j 为信号下标 (SHG/THG 为 -1)。signals 省略时取泵浦列表自身
+    (此时 SFG/DFG 只计 i < j 的组合，i = j 即 SHG 与零频)。band_unit 默认与 unit 相同。
+    progress(已处理泵浦行数, 总行数) 在每块之后调用 (可在其中抛出异常以中止计算)。
+    """
+    unknown = set(processes) - set(PROCESSES)
+    if unknown:
+        raise ValueError(f"未知过程: {', '.join(sorted(unknown))}")
+    unit_type(unit)
+    lo, hi = band_to_hz(band, band_unit or unit)
+    fp = convert_abs(np.atleast_1d(np.asarray(pumps, dtype=float)), unit, 'Hz')
+    same = signals is None
+    fs = fp if same else convert_abs(np.atleast_1d(np.asarray(signals, dtype=float)), unit, 'Hz')
+
+    for process, order in (('SHG', 2), ('THG', 3)):
+        if process in processes:
+            f = order * fp
+            keep = np.nonzero((f >= lo) & (f <= hi))[0]
+            yield _records(process, keep, -1, f[keep])
+
+    pairs = [p for p in ('SFG', 'DFG') if p in processes]
+    if not pairs or not len(fs):
+        if progress:
+            progress(len(fp), len(fp))
+        return
+    rows = max(1, chunk // len(fs))
+    for start in range(0, len(fp), rows):
+        block = fp[start:start + rows, None]
+        for process in pairs:
+            f = block + fs[None, :] if process == 'SFG' else np.abs(block - fs[None, :])
+            mask = (f >= lo) & (f <= hi)
+            if same:
+                # 同一列表自身组合: 只取上三角，去掉重复的 (j, i) 与对角线
+                mask &= np.arange(len(fs))[None, :] > np.arange(start, start + len(block))[:, None]
+            r, c = np.nonzero(mask)
+            yield _records(process, r + start, c, f[r, c])
+        if progress:
+            progress(start + len(block), len(fp))
+
+
+def mixing_table(pumps, signals=None, unit='nm', processes=PROCESSES, band=None, band_unit=None,
+                 chunk=DEFAULT_CHUNK, progress=None):
+    """所有落在目标波段内的组合，按输出频率升序排列"""
+    blocks = list(iter_mixing(pumps, signals, unit, processes, band, band_unit, chunk, progress))
+    table = np.concatenate(blocks) if blocks else np.empty(0, dtype=RESULT_DTYPE)
+    return table[np.argsort(table['freq'], kind='stable')]
+
+
+def output_in(table, unit):
+    """结果表中的输出频率换算到任意绝对单位"""
+    return convert_abs(table['freq'], 'Hz', unit)
@@ -0,0 +1,156 @@
+"""光谱在波长 / 频率 / 波数域之间的重采样 (含雅可比修正)
+
+整条光谱换域不仅是横轴 C/λ 的换算：单位横轴上的强度 (谱密度) 还要乘以 |dx_src/dx_dst|，
+其值由 _calc_delta 中的 Δ 关系 (convert_delta) 给出。结果通常还需要重采样到新域的均匀网格:
+    interp  线性插值 (取样点处的谱密度)
+    rebin   通量守恒重分箱 (每个目标区间内的积分 / 区间宽度)
+按目标网格分块处理，每块只读取源数据中对应的一段，适用于 10⁷~10⁸ 点的 memmap 数据。
+
+示例:
+    python resample.py osa.npy nm THz 190 200 100000 -o osa_thz.npy --method rebin
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from waveconvert import convert_abs, convert_delta, unit_type
+
+DEFAULT_CHUNK = 1 << 20
+METHODS = ('interp', 'rebin')
+
+
+def jacobian(x, src_unit, dst_unit):
+    """|dx_src / dx_dst|，x 为源域坐标 (src_unit)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 1.0 / np.abs(convert_delta(1.0, src_unit, dst_unit, x, src_unit))
+
+
+def convert_spectrum(x, y, src_unit, dst_unit):
+    """逐点换域 (不重采样): 返回 (x_dst, y_dst)，点的顺序不变"""
+    x = np.asarray(x, dtype=float)
+    return convert_abs(x, src_unit, dst_unit), np.asarray(y, dtype=float) * jacobian(x, src_unit, dst_unit)
+
+
+def uniform_grid(start, stop, n):
+    """目标域的均匀网格 (点中心)"""
+    return np.linspace(start, stop, n)
+
+
+def _ascending(x, y):
+    """保证源横轴升序 (降序时返回反向视图，不复制 memmap)"""
+    if len(x) > 1 and x[0] > x[-1]:
+        return x[::-1], y[::-1]
+    return x, y
+
+
+def _source_slice(xs, lo, hi):
+    """源数据中覆盖 [lo, hi] 的索引范围 (两侧各多取一个点)"""
+    i0 = max(int(np.searchsorted(xs, lo, side='right')) - 1, 0)
+    i1 = min(int(np.searchsorted(xs, hi, side='left')) + 1, len(xs))
+    return i0, i1
+
+
+def _cumulative(xs, ys, s):
+    """源谱在 [xs[0], s] 上的积分 (分段线性精确积分)"""
+    dx = np.diff(xs)
+    seg = 0.5 * (ys[1:] + ys[:-1]) * dx
+    cum = np.concatenate(([0.0], np.cumsum(seg)))
+    j = np.clip(np.searchsorted(xs, s, side='right') - 1, 0, len(xs) - 2)
+    t = s - xs[j]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (ys[j + 1] - ys[j]) / dx[j]
+    return cum[j] + ys[j] * t + 0.5 * slope * t ** 2
+
+
+def _interp_chunk(xs, ys, grid, src_unit, dst_unit):
+    s = convert_abs(grid, dst_unit, src_unit)
+    lo, hi = np.nanmin(s), np.nanmax(s)
+    i0, i1 = _source_slice(xs, lo, hi)
+    xc, yc = np.asarray(xs[i0:i1], dtype=float), np.asarray(ys[i0:i1], dtype=float)
+    out = np.interp(s, xc, yc, left=np.nan, right=np.nan) if len(xc) else np.full(len(s), np.nan)
+    return out * jacobian(s, src_unit, dst_unit)
+
+
+def _rebin_chunk(xs, ys, edges, src_unit, dst_unit):
+    s = convert_abs(edges, dst_unit, src_unit)
+    lo, hi = np.nanmin(s), np.nanmax(s)
+    i0, i1 = _source_slice(xs, lo, hi)
+    xc, yc = np.asarray(xs[i0:i1], dtype=float), np.asarray(ys[i0:i1], dtype=float)
+    if len(xc) < 2:
+        return np.full(len(edges) - 1, np.nan)
+    flux = np.abs(np.diff(_cumulative(xc, yc, s)))
+    out = flux / np.abs(np.diff(edges))
+    a, b = np.minimum(s[:-1], s[1:]), np.maximum(s[:-1], s[1:])
+    out[(a < xs[0]) | (b > xs[-1])] = np.nan     # 超出源覆盖范围
+    return out
+
+
+def iter_resample(x, y, src_unit, dst_unit, grid, method='interp', chunk=DEFAULT_CHUNK):
+    """分块重采样，逐块产出 (起始下标, 目标域谱密度)
+
+    x 需单调 (升序或降序)，可为 memmap；grid 为目标域中单调的均匀或非均匀网格。
+    rebin 方法以相邻网格点的中点为区间边界 (两端按半个间距外推)。
+    """
+    if method not in METHODS:
+        raise ValueError(f"未知方法: {method}")
+    unit_type(src_unit), unit_type(dst_unit)
+    xs, ys = _ascending(x, y)
+    grid = np.asarray(grid, dtype=float)
+    for start in range(0, len(grid), chunk):
+        g = grid[start:start + chunk]
+        if method == 'interp':
+            yield start, _interp_chunk(xs, ys, g, src_unit, dst_unit)
+            continue
+        # 当前块的区间边界: 需要相邻块的网格点来确定两端
+        left = grid[start - 1] if start > 0 else 2 * grid[0] - grid[1]
+        stop = start + len(g)
+        right = grid[stop] if stop < len(grid) else 2 * grid[-1] - grid[-2]
+        pts = np.concatenate(([left], g, [right]))
+        edges = 0.5 * (pts[1:] + pts[:-1])
+        yield start, _rebin_chunk(xs, ys, edges, src_unit, dst_unit)
+
+
+def resample(x, y, src_unit, dst_unit, grid, method='interp', chunk=DEFAULT_CHUNK, out=None):
+    """重采样到目标网格；out 可传入预先分配的数组 (如 memmap)"""
+    if out is None:
+        out = np.empty(len(grid))
+    for start, values in iter_resample(x, y, src_unit, dst_unit, grid, method, chunk):
+        out[start:start + len(values)] = values
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="光谱换域并重采样到均匀网格 (雅可比修正)")
+    parser.add_argument('path', help="输入 .npy，形状 (N, 2)：横轴, 谱密度")
+    parser.add_argument('src_unit', help="输入横轴单位，如 nm")
+    parser.add_argument('dst_unit', help="目标单位，如 THz 或 1/cm")
+    parser.add_argument('start', type=float, help="目标网格起点 (dst_unit)")
+    parser.add_argument('stop', type=float, help="目标网格终点 (dst_unit)")
+    parser.add_argument('n', type=int, help="目标网格点数")
+    parser.add_argument('-o', '--output', required=True, help="输出 .npy，形状 (n, 2)")
+    parser.add_argument('--method', choices=METHODS, default='interp', help="默认 %(default)s")
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK, help="每块目标点数")
+    args = parser.parse_args(argv)
+
+    if args.n < 2:
+        parser.error("目标网格点数至少为 2")
+    try:
+        data = np.load(args.path, mmap_mode='r')
+        if data.ndim != 2 or data.shape[1] < 2:
+            raise ValueError(f"需要 (N, 2) 数组，实际为 {data.shape}")
+        grid = uniform_grid(args.start, args.stop, args.n)
+        out = np.lib.format.open_memmap(args.output, mode='w+', dtype=np.float64, shape=(args.n, 2))
+        out[:, 0] = grid
+        resample(data[:, 0], data[:, 1], args.src_unit, args.dst_unit, grid,
+                 args.method, args.chunk, out=out[:, 1])
+        out.flush()
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"错误: {e}\n")
+    print(f"已重采样 {len(data)} -> {args.n} 点: {args.src_unit} -> {args.dst_unit} ({args.method})",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""光纤耦合蒙特卡罗容差分析 (多进程)
+
+按块向量化采样制造/对准误差 (焦距公差、光斑直径与 MFD 离散、横向偏移、倾角、离焦)，
+用 coupling 中的公式计算每个样本的耦合效率与焦距误差。各块分配到进程池执行，
+随机种子由 SeedSequence.spawn 按块派生，结果与进程数无关、可复现。
+每块只返回直方图与累计量，内存占用与样本数无关。
+
+示例:
+    python tolerance.py 1550 2 10.4 --focal 10.5 --focal-tol 1 --lateral 0.5 -n 10000000
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from coupling import coupling_efficiency, focal_length
+
+EFF_BINS = 10000            # 效率直方图 [0, 1]
+FOCAL_ERR_RANGE = 0.5       # 相对焦距误差直方图范围 ±50 %
+FOCAL_ERR_BINS = 10000
+
+
+def sample_block(rng, n, wavelength, diameter, mfd, focal, tol):
+    """采样一块并返回 (效率, 相对焦距误差) 数组
+
+    tol 中的误差项均为 1σ 正态分布: focal_tol / diameter_spread / mfd_spread 为相对值，
+    lateral / defocus 单位 m，tilt 单位 rad (lateral 与 tilt 为每轴 σ)。
+    """
+    def g():
+        return rng.standard_normal(n)
+
+    f = focal * (1 + tol.get('focal_tol', 0.0) * g())
+    d = diameter * (1 + tol.get('diameter_spread', 0.0) * g())
+    m = mfd * (1 + tol.get('mfd_spread', 0.0) * g())
+    # 横向偏移与倾角按二维各向同性采样，取径向大小
+    lateral = tol.get('lateral', 0.0) * np.hypot(g(), g())
+    tilt = tol.get('tilt', 0.0) * np.hypot(g(), g())
+    defocus = tol.get('defocus', 0.0) * g()
+    eta = coupling_efficiency(wavelength, d, m, focal=f, lateral=lateral, tilt=tilt, defocus=defocus)
+    f_ideal = focal_length(wavelength, d, m)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        focal_err = f / f_ideal - 1
+    return eta, focal_err
+
+
+def _block_stats(seed, n, design, tol):
+    """工作进程中执行: 采样一块并汇总为直方图与累计量"""
+    rng = np.random.default_rng(seed)
+    eta, err = sample_block(rng, n, *design, tol)
+    err = err[np.isfinite(err)]
+    return {
+        'n': n, 'err_n': len(err),
+        'eta_hist': np.histogram(eta, bins=EFF_BINS, range=(0.0, 1.0))[0],
+        'err_hist': np.histogram(np.clip(err, -FOCAL_ERR_RANGE, FOCAL_ERR_RANGE),
+                                 bins=FOCAL_ERR_BINS, range=(-FOCAL_ERR_RANGE, FOCAL_ERR_RANGE))[0],
+        'eta_sum': float(eta.sum()), 'eta_sq': float(np.square(eta).sum()),
+        'eta_min': float(eta.min()), 'eta_max': float(eta.max()),
+        'err_sum': float(err.sum()), 'err_sq': float(np.square(err).sum()),
+        'err_min': float(err.min()) if len(err) else np.inf,
+        'err_max': float(err.max()) if len(err) else -np.inf,
+    }
+
+
+def _merge(acc, part):
+    if acc is None:
+        return dict(part)
+    for key in ('n', 'err_n', 'eta_hist', 'err_hist', 'eta_sum', 'eta_sq', 'err_sum', 'err_sq'):
+        acc[key] = acc[key] + part[key]
+    for key in ('eta_min', 'err_min'):
+        acc[key] = min(acc[key], part[key])
+    for key in ('eta_max', 'err_max'):
+        acc[key] = max(acc[key], part[key])
+    return acc
+
+
+def run_tolerance(wavelength, diameter, mfd, focal=None, tol=None, n_samples=1_000_000,
+                  block_size=250_000, workers=None, seed=0):
+    """执行蒙特卡罗分析 (SI 单位)，返回合并后的统计字典
+
+    workers=1 时在当前进程内顺序执行，便于调试。
+    """
+    if n_samples < 1 or block_size < 1:
+        raise ValueError("样本数与每块样本数必须 >= 1")
+    if focal is None:
+        focal = float(focal_length(wavelength, diameter, mfd))
+    design = (wavelength, diameter, mfd, focal)
+    tol = dict(tol or {})
+    sizes = [block_size] * (n_samples // block_size)
+    if n_samples % block_size:
+        sizes.append(n_samples % block_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    job = partial(_block_stats, design=design, tol=tol)
+
+    acc = None
+    start = time.perf_counter()
+    if workers == 1:
+        for s, n in zip(seeds, sizes):
+            acc = _merge(acc, job(s, n))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(job, seeds, sizes):
+                acc = _merge(acc, part)
+    acc['seconds'] = time.perf_counter() - start
+    acc['focal'] = focal
+    return acc
+
+
+def _hist_percentile(hist, lo, hi, q, vmin=-np.inf, vmax=np.inf):
+    """由直方图估计分位数: 在所在区间内线性插值，并限制在样本实际范围 [vmin, vmax] 内
+
+    (分布退化为单点时，如零公差，结果即为该点而不是区间中点)
+    """
+    cdf = np.cumsum(hist)
+    target = np.asarray(q, dtype=float) / 100.0 * cdf[-1]
+    idx = np.minimum(np.searchsorted(cdf, target), len(hist) - 1)
+    below = np.where(idx > 0, cdf[idx - 1], 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = np.clip(np.nan_to_num((target - below) / hist[idx]), 0.0, 1.0)
+    width = (hi - lo) / len(hist)
+    return np.clip(lo + (idx + frac) * width, vmin, vmax)
+
+
+def summarize(stats, yield_threshold=0.8):
+    """分布摘要: 均值、标准差、分位数与达标率"""
+    n = stats['n']
+    eta_mean = stats['eta_sum'] / n
+    err_n = max(stats['err_n'], 1)
+    err_mean = stats['err_sum'] / err_n
+    edges = np.linspace(0.0, 1.0, EFF_BINS + 1)
+    passed = stats['eta_hist'][edges[:-1] >= yield_threshold].sum()
+    return {
+        'n': n,
+        'eta_mean': eta_mean,
+        'eta_std': np.sqrt(max(stats['eta_sq'] / n - eta_mean ** 2, 0.0)),
+        'eta_min': stats['eta_min'],
+        'eta_max': stats['eta_max'],
+        'eta_p': dict(zip((1, 5, 50, 95, 99),
+                          _hist_percentile(stats['eta_hist'], 0.0, 1.0, [1, 5, 50, 95, 99],
+                                           stats['eta_min'], stats['eta_max']))),
+        'yield': passed / n,
+        'err_mean': err_mean,
+        'err_std': np.sqrt(max(stats['err_sq'] / err_n - err_mean ** 2, 0.0)),
+        'err_p': dict(zip((5, 50, 95), _hist_percentile(
+            stats['err_hist'], -FOCAL_ERR_RANGE, FOCAL_ERR_RANGE, [5, 50, 95],
+            stats['err_min'], stats['err_max']))),
+    }
+
+
+def format_summary(s, threshold):
+    p = s['eta_p']
+    return (f"样本数: {s['n']}\n"
+            f"耦合效率: 均值 {s['eta_mean']*100:.2f} %，σ {s['eta_std']*100:.2f} %，"
+            f"范围 [{s['eta_min']*100:.2f}, {s['eta_max']*100:.2f}] %\n"
+            f"  分位数 P1 {p[1]*100:.2f} / P5 {p[5]*100:.2f} / P50 {p[50]*100:.2f} / "
+            f"P95 {p[95]*100:.2f} / P99 {p[99]*100:.2f} %\n"
+            f"  效率 ≥ {threshold*100:.0f} % 的良率: {s['yield']*100:.2f} %\n"
+            f"焦距误差: 均值 {s['err_mean']*100:+.3f} %，σ {s['err_std']*100:.3f} %，"
+            f"P5/P50/P95 {s['err_p'][5]*100:+.3f} / {s['err_p'][50]*100:+.3f} / {s['err_p'][95]*100:+.3f} %")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="光纤耦合蒙特卡罗容差分析")
+    parser.add_argument('wavelength', type=float, help="波长 (nm)")
+    parser.add_argument('diameter', type=float, help="入射光斑直径 (mm)")
+    parser.add_argument('mfd', type=float, help="模场直径 MFD (μm)")
+    parser.add_argument('--focal', type=float, default=None, help="实际透镜标称焦距 (mm)，缺省为理想焦距")
+    parser.add_argument('--focal-tol', type=float, default=0.0, help="焦距公差 1σ (%%)")
+    parser.add_argument('--diameter-spread', type=float, default=0.0, help="光斑直径离散 1σ (%%)")
+    parser.add_argument('--mfd-spread', type=float, default=0.0, help="MFD 离散 1σ (%%)")
+    parser.add_argument('--lateral', type=float, default=0.0, help="横向偏移 每轴 1σ (μm)")
+    parser.add_argument('--tilt', type=float, default=0.0, help="倾角 每轴 1σ (mrad)")
+    parser.add_argument('--defocus', type=float, default=0.0, help="离焦 1σ (μm)")
+    parser.add_argument('-n', '--samples', type=int, default=1_000_000, help="样本数")
+    parser.add_argument('--block-size', type=int, default=250_000, help="每块样本数")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help="进程数")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('--threshold', type=float, default=80.0, help="良率判定的效率门限 (%%)")
+    args = parser.parse_args(argv)
+    for name, value in (('-n/--samples', args.samples), ('--block-size', args.block_size),
+                        ('-j/--workers', args.workers)):
+        if value < 1:
+            parser.error(f"{name} 必须 >= 1")
+
+    tol = {'focal_tol': args.focal_tol / 100, 'diameter_spread': args.diameter_spread / 100,
+           'mfd_spread': args.mfd_spread / 100, 'lateral': args.lateral * 1e-6,
+           'tilt': args.tilt * 1e-3, 'defocus': args.defocus * 1e-6}
+    stats = run_tolerance(args.wavelength * 1e-9, args.diameter * 1e-3, args.mfd * 1e-6,
+                          focal=None if args.focal is None else args.focal * 1e-3, tol=tol,
+                          n_samples=args.samples, block_size=args.block_size,
+                          workers=args.workers, seed=args.seed)
+    print(f"标称焦距: {stats['focal']*1e3:.3f} mm")
+    print(format_summary(summarize(stats, args.threshold / 100), args.threshold / 100))
+    print(f"用时 {stats['seconds']:.2f} s ({stats['n'] / max(stats['seconds'], 1e-9):.3g} 样本/s)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
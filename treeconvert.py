@@ -0,0 +1,147 @@
+"""目录树批量转换 (多进程)
+
+遍历目录树中的光谱/日志文件，用 ProcessPoolExecutor 把逐文件转换分配到多个核心。
+文本文件按 batchconvert 的列规则转换，.npy 文件按 axisconvert 转换横轴；
+每个结果先写入临时文件再 os.replace，保证单个文件的写入是原子的。
+
+示例:
+    python treeconvert.py logs/ -o converted/ --abs 0 nm THz --workers 16
+    python treeconvert.py spectra/ --in-place --pattern "*.npy" --axis nm 1/cm
+"""
+import argparse
+import fnmatch
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import axisconvert
+import batchconvert
+from waveconvert import unit_type
+
+DEFAULT_PATTERNS = ('*.csv', '*.txt', '*.dat', '*.npy')
+
+
+def iter_files(root, patterns, exclude=None):
+    """按文件名模式遍历目录树，按路径排序以保证结果可复现
+
+    exclude 为不遍历的目录 (如位于 root 之内的输出目录，避免边写边读)。
+    """
+    exclude = os.path.realpath(exclude) if exclude else None
+    for dirpath, dirnames, filenames in os.walk(root):
+        if exclude:
+            dirnames[:] = [d for d in dirnames if os.path.realpath(os.path.join(dirpath, d)) != exclude]
+        dirnames.sort()
+        for name in sorted(filenames):
+            if any(fnmatch.fnmatch(name, p) for p in patterns):
+                yield os.path.join(dirpath, name)
+
+
+def _tmp_path(path):
+    head, tail = os.path.split(path)
+    return os.path.join(head, f".{tail}.tmp{os.getpid()}")
+
+
+def _has_work(path, conversions, axis):
+    """.npy 需要 --axis，文本文件需要列转换；否则该文件跳过 (不计为失败)"""
+    return axis is not None if path.endswith('.npy') else bool(conversions)
+
+
+def convert_one(path, root, out_root, conversions, axis, text_opts):
+    """转换单个文件 (在工作进程中执行)，返回 (路径, 点数/行数, 字节数, 错误信息)"""
+    dst = path if out_root is None else os.path.join(out_root, os.path.relpath(path, root))
+    tmp = _tmp_path(dst)
+    try:
+        os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+        if path.endswith('.npy'):
+            from_unit, to_unit, column = axis
+            n = axisconvert.convert_file(path, from_unit, to_unit, output=tmp, column=column)
+        else:
+            with open(path, encoding='utf-8', newline='') as src, \
+                    open(tmp, 'w', encoding='utf-8', newline='') as out:
+                n = batchconvert.convert_stream(src, out, conversions, **text_opts)
+        os.replace(tmp, dst)
+        return path, n, os.path.getsize(path), None
+    except Exception as e:   # 单个文件失败不影响整批
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return path, 0, 0, f"{type(e).__name__}: {e}"
+
+
+def run(root, out_root, conversions, axis=None, patterns=DEFAULT_PATTERNS, workers=None,
+        text_opts=None, chunksize=16, log=sys.stderr):
+    """执行整批转换并返回统计字典"""
+    job = partial(convert_one, root=root, out_root=out_root, conversions=conversions,
+                  axis=axis, text_opts=text_opts or {})
+    stats = {'files': 0, 'failed': 0, 'skipped': 0, 'items': 0, 'bytes': 0}
+
+    def todo():
+        for path in iter_files(root, patterns, exclude=out_root):
+            if _has_work(path, conversions, axis):
+                yield path
+            else:
+                stats['skipped'] += 1
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, n, size, err in pool.map(job, todo(), chunksize=chunksize):
+            if err is not None:
+                stats['failed'] += 1
+                print(f"失败: {path}: {err}", file=log)
+                continue
+            stats['files'] += 1
+            stats['items'] += n
+            stats['bytes'] += size
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+def format_summary(stats, workers):
+    secs = max(stats['seconds'], 1e-9)
+    return (f"完成 {stats['files']} 个文件 (失败 {stats['failed']}，跳过 {stats['skipped']})，"
+            f"{stats['items']} 行/点，{stats['bytes'] / 1e6:.1f} MB，用时 {secs:.2f} s，"
+            f"{workers} 进程 | {stats['files'] / secs:.1f} 文件/s，"
+            f"{stats['items'] / secs:.3g} 行/s，{stats['bytes'] / 1e6 / secs:.1f} MB/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多进程批量转换目录树中的光谱/日志文件")
+    parser.add_argument('root', help="输入目录")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('-o', '--output', help="输出目录 (保持相对目录结构)")
+    target.add_argument('--in-place', action='store_true', help="原子地替换原文件")
+    parser.add_argument('--pattern', action='append', default=None,
+                        help=f"文件名模式，可重复 (默认 {' '.join(DEFAULT_PATTERNS)})")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help="工作进程数 (默认为 CPU 核数 %(default)s)")
+    parser.add_argument('--axis', nargs=2, metavar=('FROM', 'TO'),
+                        help=".npy 文件横轴转换单位，如 --axis nm THz")
+    parser.add_argument('--column', type=int, default=0, help=".npy 二维数据中横轴所在列")
+    batchconvert.add_conversion_args(parser)
+    args = parser.parse_args(argv)
+
+    conversions = batchconvert.parse_conversions(parser, args, required=False)
+    axis = None
+    if args.axis:
+        try:
+            unit_type(args.axis[0]), unit_type(args.axis[1])
+        except ValueError as e:
+            parser.error(str(e))
+        axis = (args.axis[0], args.axis[1], args.column)
+    if not conversions and axis is None:
+        parser.error("至少需要 --axis 或一个 --abs / --delta / --power")
+    if args.workers < 1:
+        parser.error("--workers 必须 >= 1")
+
+    text_opts = {'delimiter': batchconvert.parse_delimiter(args.delimiter), 'header': args.header,
+                 'replace': args.replace, 'chunk_rows': args.chunk_rows}
+    stats = run(args.root, None if args.in_place else args.output, conversions, axis,
+                patterns=args.pattern or DEFAULT_PATTERNS, workers=args.workers,
+                text_opts=text_opts)
+    print(format_summary(stats, args.workers), file=sys.stderr)
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+import numpy as np
+
+# --- 常量定义 ---
+C = 299_792_458.0  # 光速 m/s
+H = 6.626_070_15e-34  # 普朗克常数 J·s
+E_CHARGE = 1.602_176_634e-19  # 元电荷 C (1 eV = E_CHARGE J)
+
+# 单位换算因子
+UNIT_FACTORS = {
+    'frequency': {'Hz': 1, 'MHz': 1e6, 'GHz': 1e9, 'THz': 1e12},
+    'wavelength': {'m': 1, 'mm': 1e-3, 'µm': 1e-6, 'nm': 1e-9, 'pm': 1e-12},
+    'wavenumber': {'1/m': 1, '1/cm': 1e2},
+}
+
+# 单位名 -> 物理量类型 (单位名在各类型之间不重复)
+UNIT_TYPES = {u: t for t, units in UNIT_FACTORS.items() for u in units}
+# 允许用 'um' 代替 'µm'，方便命令行输入
+UNIT_ALIASES = {'um': 'µm', 'μm': 'µm'}
+
+# 物理量类型 -> GUI 中使用的 tag (绝对值 / 变化量)
+ABS_TAGS = {'frequency': 'f', 'wavelength': 'l', 'wavenumber': 'k'}
+DELTA_TAGS = {'frequency': 'df', 'wavelength': 'dl', 'wavenumber': 'dk'}
+
+
+def unit_type(unit):
+    """返回单位所属的物理量类型"""
+    unit = UNIT_ALIASES.get(unit, unit)
+    try:
+        return UNIT_TYPES[unit]
+    except KeyError:
+        raise ValueError(f"未知单位: {unit}") from None
+
+
+def to_si(values, unit):
+    """数值(数组) -> SI 单位"""
+    unit = UNIT_ALIASES.get(unit, unit)
+    return np.asarray(values, dtype=float) * UNIT_FACTORS[unit_type(unit)][unit]
+
+
+def from_si(values, unit):
+    """SI 单位 -> 目标单位数值(数组)"""
+    unit = UNIT_ALIASES.get(unit, unit)
+    return np.asarray(values, dtype=float) / UNIT_FACTORS[unit_type(unit)][unit]
+
+
+# --- 向量化核心公式 (SI 单位) ---
+
+def abs_si(src, values):
+    """由 f / l / k 之一计算 (f, l, k)，逐元素向量化"""
+    x = np.asarray(values, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if src == 'f':
+            l_si = C / x
+            return x, l_si, 1.0 / l_si
+        if src == 'l':
+            return C / x, x, 1.0 / x
+        if src == 'k':
+            l_si = 1.0 / x
+            return C / l_si, l_si, x
+    raise ValueError(f"未知的绝对值类型: {src}")
+
+
+def delta_si(src, values, base_l, group_index=1.0):
+    """由 df / dl / dk 之一计算 (df, dl, dk)，中心波长 base_l 可逐元素广播
+
+    group_index 为介质群折射率 n_g (缺省为真空)，此时 dk 为介质内波数的变化量。
+    """
+    # 物理公式: |df| = (c / lambda^2) * |dl|
+    #          |dk| = n_g * |dl| / lambda^2
+    x, base_l, ng = np.broadcast_arrays(np.asarray(values, dtype=float),
+                                        np.asarray(base_l, dtype=float),
+                                        np.asarray(group_index, dtype=float))
+    l2 = base_l ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if src == 'df':
+            return x, (l2 / C) * x, ng * x / C
+        if src == 'dl':
+            return (C / l2) * x, x, ng * x / l2
+        if src == 'dk':
+            return x * C / ng, x * l2 / ng, x
+    raise ValueError(f"未知的变化量类型: {src}")
+
+
+# --- 按单位名的批量转换 ---
+
+def convert_abs(values, from_unit, to_unit):
+    """绝对值转换，如 nm -> THz、1/cm -> µm"""
+    src = ABS_TAGS[unit_type(from_unit)]
+    dst = unit_type(to_unit)
+    f_si, l_si, k_si = abs_si(src, to_si(values, from_unit))
+    out = {'frequency': f_si, 'wavelength': l_si, 'wavenumber': k_si}[dst]
+    return from_si(out, to_unit)
+
+
+def convert_delta(values, from_unit, to_unit, center, center_unit='nm', group_index=1.0):
+    """变化量转换，如 Δnm -> ΔGHz；center 为中心值(任意绝对单位)，可逐元素广播
+
+    group_index 可为数值/数组，或可调用对象 (由中心真空波长 [m] 计算 n_g，如介质色散)。
+    """
+    src = DELTA_TAGS[unit_type(from_unit)]
+    dst = unit_type(to_unit)
+    base_l = convert_abs(center, center_unit, 'm')
+    if callable(group_index):
+        group_index = group_index(base_l)
+    df_si, dl_si, dk_si = delta_si(src, to_si(values, from_unit), base_l, group_index)
+    out = {'frequency': df_si, 'wavelength': dl_si, 'wavenumber': dk_si}[dst]
+    return from_si(out, to_unit)
+
+
+# --- 精确区间 (宽带滤波器 / 超连续谱) ---
+# delta_si 是 Δf = cΔλ/λ² 的一阶近似；宽带时端点应逐一按 f = c/λ 换算，
+# 且端点相对中心的偏移不再对称。精确区间只按真空换算 (不含介质群折射率)。
+
+BAND_ERROR_THRESHOLD = 1e-3     # 一阶公式相对误差超过此值时 GUI 给出提示
+
+
+def band_si(src, values, base_l):
+    """以 base_l 为中心、在 src 域 (df / dl / dk) 中宽度为 values 的区间，端点逐一精确换算
+
+    返回 (f1, f2, l1, l2, k1, k2)，各域端点均为升序；端点非物理 (如 Δλ ≥ 2λ) 时为 NaN。
+    """
+    tag = {'df': 'f', 'dl': 'l', 'dk': 'k'}.get(src)
+    if tag is None:
+        raise ValueError(f"未知的变化量类型: {src}")
+    x, base_l = np.broadcast_arrays(np.asarray(values, dtype=float), np.asarray(base_l, dtype=float))
+    x0 = abs_si('l', base_l)['flk'.index(tag)]
+    lo = x0 - 0.5 * np.abs(x)
+    lo = np.where(lo > 0, lo, np.nan)
+    edges = []
+    for a, b in zip(abs_si(tag, lo), abs_si(tag, x0 + 0.5 * np.abs(x))):
+        edges += [np.minimum(a, b), np.maximum(a, b)]
+    return tuple(edges)
+
+
+def band_offsets_si(src, values, base_l):
+    """区间端点相对中心的偏移 (df1, df2, dl1, dl2, dk1, dk2)，下端 ≤ 0 ≤ 上端，一般不对称"""
+    center = abs_si('l', base_l)
+    edges = band_si(src, values, base_l)
+    return tuple(e - center[i // 2] for i, e in enumerate(edges))
+
+
+def linear_error(src, values, base_l):
+    """一阶公式的相对误差: 各域端点偏移与 ±Δ/2 (delta_si) 的最大相对偏差"""
+    approx = delta_si(src, values, base_l)
+    offsets = band_offsets_si(src, values, base_l)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        errs = [np.maximum(np.abs(lo + h), np.abs(hi - h)) / h
+                for h, lo, hi in zip((0.5 * np.abs(d) for d in approx), offsets[::2], offsets[1::2])]
+    return np.maximum.reduce(errs)
+
+
+def convert_band(values, from_unit, to_unit, center, center_unit='nm'):
+    """宽度 values (Δ 单位 from_unit) 的区间端点精确换算为绝对单位 to_unit，返回 (下端, 上端)
+
+    values 与 center 可逐元素广播，适用于大批量滤波器规格表。
+    """
+    src = DELTA_TAGS[unit_type(from_unit)]
+    edges = band_si(src, to_si(values, from_unit), convert_abs(center, center_unit, 'm'))
+    i = 'flk'.index(ABS_TAGS[unit_type(to_unit)])
+    return from_si(edges[2 * i], to_unit), from_si(edges[2 * i + 1], to_unit)
+
+
+def describe_band(src, value, base_l, threshold=BAND_ERROR_THRESHOLD, title="精确区间"):
+    """单个区间的精确端点说明 (GUI 用，端点为真空值)，一阶误差超过 threshold 时加 ⚠ 标记"""
+    f1, f2, l1, l2, _, _ = (float(v) for v in band_si(src, value, base_l))
+    if not value or np.isnan(l1):
+        return ""
+    df1, df2 = f1 - C / base_l, f2 - C / base_l
+    dl1, dl2 = l1 - base_l, l2 - base_l
+    err = float(linear_error(src, value, base_l))
+    flag = " ⚠" if err > threshold else ""
+    return (f"{title}: {l1 * 1e9:.10g} ~ {l2 * 1e9:.10g} nm | {f1 / 1e12:.10g} ~ {f2 / 1e12:.10g} THz\n"
+            f"偏移: {dl1 * 1e9:+.4g}/{dl2 * 1e9:+.4g} nm, {df1 / 1e9:+.4g}/{df2 / 1e9:+.4g} GHz"
+            f"  一阶误差 {err * 100:.3g} %{flag}")
+
+
+# --- 功率转换 (dBm / mW / W) ---
+
+POWER_UNITS = ('dBm', 'mW', 'W')
+
+
+def power_to_mw(values, unit):
+    """功率数值(数组) -> mW"""
+    x = np.asarray(values, dtype=float)
+    if unit == 'dBm':
+        return 10 ** (x / 10.0)
+    if unit == 'mW':
+        return x
+    if unit == 'W':
+        return x * 1000.0
+    raise ValueError(f"未知功率单位: {unit}")
+
+
+def mw_to_power(mw, unit):
+    """mW -> 目标功率单位；非正功率的 dBm 记为 -100，与 GUI 一致"""
+    mw = np.asarray(mw, dtype=float)
+    if unit == 'dBm':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(mw > 0, 10 * np.log10(mw), -100.0)
+    if unit == 'mW':
+        return mw
+    if unit == 'W':
+        return mw / 1000.0
+    raise ValueError(f"未知功率单位: {unit}")
+
+
+def convert_power(values, from_unit, to_unit):
+    """功率转换，如 dBm -> mW"""
+    return mw_to_power(power_to_mw(values, from_unit), to_unit)
+
+
+# --- 光子能量 / 光子通量 ---
+
+def photon_energy(values, unit):
+    """由任意绝对单位 (频率/波长/波数) 计算单光子能量，返回 (J, eV)"""
+    f_si = convert_abs(values, unit, 'Hz')
+    e_j = H * f_si
+    return e_j, e_j / E_CHARGE
+
+
+def photon_flux(power, wavelength, power_unit='mW', wl_unit='nm'):
+    """功率 + 波长 -> 光子通量 (photons/s)，逐元素广播"""
+    p_w = power_to_mw(power, power_unit) / 1000.0
+    e_j, _ = photon_energy(wavelength, wl_unit)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return p_w / e_j
+
+
+def flux_to_power(flux, wavelength, power_unit='mW', wl_unit='nm'):
+    """光子通量 (photons/s) + 波长 -> 功率"""
+    e_j, _ = photon_energy(wavelength, wl_unit)
+    return mw_to_power(np.asarray(flux, dtype=float) * e_j * 1000.0, power_unit)